@@ -0,0 +1,85 @@
+# Anne LoVerso
+# Python Set Game - image cache
+
+'''
+Process-wide cache of the images the game loads
+Every image is read from disk once, so starting or restarting a game does no
+I/O, and all games share the same surfaces. Shared surfaces must not be drawn on.
+Images are converted to the pixel format of the display as soon as there is
+one (see planes.when_display_ready), so blitting them needs no conversion.
+Images handed out before the display existed stay unconverted, so load them
+after creating the planes.Display where possible.
+'''
+
+import pygame
+
+import planes
+
+from setgame import cards
+
+_images = {} # path -> Surface
+
+# all 81 card faces packed into one surface, in code order
+_card_atlas = None
+_card_images = [] # subsurfaces of the atlas, by card code
+
+ATLAS_COLUMNS = 9
+
+'''
+Given a path, returns the image loaded from it, loading it only the first time
+'''
+def load_image (path):
+	if path not in _images:
+		_images[path] = pygame.image.load (path)
+		planes.when_display_ready (lambda: _convert_image (path))
+	return _images[path]
+
+def _convert_image (path):
+	_images[path] = planes.convert_surface (_images[path])
+
+'''
+Given a card code, returns the name of the card, which is also the name of its image
+For example "greenovalfilled1"
+'''
+def card_name (code):
+	color, shape, number, shade = cards.decode (code)
+	return color + shape + shade + str (number)
+
+'''
+Given a card code, returns its face, a subsurface of the card atlas
+'''
+def card_image (code):
+	if _card_atlas is None:
+		_build_card_atlas ()
+	return _card_images[code]
+
+# Loads the 81 card faces into one atlas surface and cuts it into subsurfaces
+def _build_card_atlas ():
+	global _card_atlas, _card_images
+
+	faces = [pygame.image.load ("img/" + card_name (code) + ".png") for code in range (cards.NUM_CARDS)]
+	width, height = faces[0].get_size ()
+	rows = (len (faces) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+
+	atlas = pygame.Surface ((ATLAS_COLUMNS*width, rows*height), faces[0].get_flags () & pygame.SRCALPHA, faces[0])
+	atlas.fill ((0, 0, 0, 0))
+
+	images = []
+	for code in range (len (faces)):
+		rect = pygame.Rect ((code % ATLAS_COLUMNS)*width, (code // ATLAS_COLUMNS)*height, width, height)
+		# BLEND_RGBA_MAX onto a cleared surface copies the pixels, alpha included,
+		# where a plain blit would blend them
+		atlas.blit (faces[code], rect, special_flags=pygame.BLEND_RGBA_MAX)
+		images.append (atlas.subsurface (rect))
+
+	_card_atlas = atlas
+	_card_images = images
+
+	planes.when_display_ready (_convert_card_atlas)
+
+# Converts the atlas and cuts the converted one into subsurfaces
+def _convert_card_atlas ():
+	global _card_atlas, _card_images
+
+	_card_atlas = planes.convert_surface (_card_atlas)
+	_card_images = [_card_atlas.subsurface (image.get_offset (), image.get_size ()) for image in _card_images]
@@ -0,0 +1,3 @@
+# Anne LoVerso
+# Python Set Game - micro-benchmarks
+# Run from the top of the repository, e.g.: python -m bench.check_set
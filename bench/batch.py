@@ -0,0 +1,38 @@
+# Anne LoVerso
+# Python Set Game - batch Set checker benchmark
+
+'''
+Checks setgame.batch against check_set, then reports boards per second for
+random 12, 15 and 18 card boards
+'''
+
+import itertools
+import time
+
+from setgame import batch
+from setgame import cards
+
+def main (num_boards=200000, seed=0):
+	boards = batch.random_boards (2000, 15, seed)
+	counts = batch.count_sets (boards)
+	table = batch.set_table (boards)
+	for row in range (len (boards)):
+		codes = [int (code) for code in boards[row]]
+		expected = [cards.is_set (*triple) for triple in itertools.combinations (codes, 3)]
+		assert list (table[row]) == expected, codes
+		assert counts[row] == sum (expected), codes
+	print ("matches check_set on " + str (len (boards)) + " random boards")
+
+	for size in (12, 15, 18):
+		boards = batch.random_boards (num_boards, size, seed)
+		start = time.perf_counter ()
+		counts = batch.count_sets (boards)
+		elapsed = time.perf_counter () - start
+		start = time.perf_counter ()
+		found = batch.has_set (boards)
+		has_set_elapsed = time.perf_counter () - start
+		print ("{} cards: {:.0f} boards / s counted, {:.0f} boards / s checked, {:.2f}% without a set, {:.2f} sets on average".format (
+			size, num_boards / elapsed, num_boards / has_set_elapsed, 100.0 * (~found).mean (), counts.mean ()))
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,74 @@
+# Anne LoVerso
+# Python Set Game - check_set benchmark
+
+'''
+Times the old attribute-string check against the encoded check_set
+over every one of the 85,320 unordered triples of the deck
+tests/test_cards.py checks that they give the same answers
+'''
+
+import itertools
+import time
+
+import set as setgame_ui
+from setgame import cards
+
+'''
+Given three attributes (one from each of three cards), checks whether the
+they are either all the same, or all different
+Was the helper method to check_set before cards were encoded
+Args: attr1, attr2, attr3 - attributes of a card (color, shape, number, shade)
+Returns: True if all three attributes are equal OR none of them are equal, False otherwise
+'''
+def all_same_or_all_diff (attr1, attr2, attr3):
+	if attr1 == attr2 and attr2 == attr3:
+		return True
+	elif (attr1 != attr2) and (attr2 != attr3) and (attr3 != attr1):
+		return True
+	else:
+		return False
+
+'''
+The check_set path from before cards carried a code, comparing attribute strings
+'''
+def old_check_set (card1, card2, card3):
+	color_check = all_same_or_all_diff (card1.color, card2.color, card3.color)
+	shape_check = all_same_or_all_diff (card1.shape, card2.shape, card3.shape)
+	num_check = all_same_or_all_diff (card1.number, card2.number, card3.number)
+	shade_check = all_same_or_all_diff (card1.shade, card2.shade, card3.shade)
+	return color_check and shape_check and num_check and shade_check
+
+'''
+Times check over all triples, returns (seconds, number of Sets)
+'''
+def run (check, triples, repeat):
+	best = None
+	found = 0
+	for i in range (repeat):
+		start = time.perf_counter ()
+		found = 0
+		for card1, card2, card3 in triples:
+			if check (card1, card2, card3):
+				found += 1
+		elapsed = time.perf_counter () - start
+		if best is None or elapsed < best:
+			best = elapsed
+	return best, found
+
+def main (repeat=5):
+	deck = []
+	for code in range (cards.NUM_CARDS):
+		color, shape, number, shade = cards.decode (code)
+		deck.append (setgame_ui.Card (color + shape + shade + str (number), color, shape, number, shade))
+	triples = list (itertools.combinations (deck, 3))
+
+	old_time, old_found = run (old_check_set, triples, repeat)
+	new_time, new_found = run (setgame_ui.check_set, triples, repeat)
+
+	print ("triples: " + str (len (triples)) + ", sets: " + str (new_found) + " new, " + str (old_found) + " old")
+	print ("old check_set: {:.1f} ms ({:.0f} ns / triple)".format (old_time * 1000, old_time * 1e9 / len (triples)))
+	print ("new check_set: {:.1f} ms ({:.0f} ns / triple)".format (new_time * 1000, new_time * 1e9 / len (triples)))
+	print ("speedup: {:.1f}x".format (old_time / new_time))
+
+if __name__ == "__main__":
+	main ()
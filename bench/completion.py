@@ -0,0 +1,55 @@
+# Anne LoVerso
+# Python Set Game - third-card completion benchmark
+
+'''
+Times the completion engine in setgame.board against the old triple loop on
+full boards. tests/test_board.py checks that they give the same answers.
+'''
+
+import random
+import time
+
+from setgame import board
+from setgame import cards
+
+'''
+The old Game.check_if_any_sets / HintButton.clicked loop over ordered triples
+Returns: the first Set found as a tuple of codes, or None
+'''
+def old_find_set (codes):
+	for code1 in codes:
+		for code2 in codes:
+			for code3 in codes:
+				if code1 != code2 and code2 != code3 and code1 != code3:
+					if cards.is_set (code1, code2, code3):
+						return (code1, code2, code3)
+	return None
+
+'''
+Times find over all boards, returns seconds per board
+'''
+def run (find, boards):
+	start = time.perf_counter ()
+	for codes in boards:
+		find (codes)
+	return (time.perf_counter () - start) / len (boards)
+
+def main (num_boards=2000, seed=0):
+	rng = random.Random (seed)
+
+	for size in (12, 15, 18, 21):
+		boards = [rng.sample (range (cards.NUM_CARDS), size) for i in range (num_boards)]
+		# a board without a set is the worst case for both, so time those on their own
+		no_set_boards = [codes for codes in boards if not board.has_set (codes)]
+		old_time = run (old_find_set, boards)
+		new_time = run (board.find_set, boards)
+		print ("{} cards: old {:.1f} us, new {:.1f} us per board ({:.0f}x)".format (
+			size, old_time * 1e6, new_time * 1e6, old_time / new_time))
+		if no_set_boards:
+			old_time = run (old_find_set, no_set_boards)
+			new_time = run (board.find_set, no_set_boards)
+			print ("{} cards, no set: old {:.1f} us, new {:.1f} us per board ({:.0f}x)".format (
+				size, old_time * 1e6, new_time * 1e6, old_time / new_time))
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,55 @@
+# Anne LoVerso
+# Python Set Game - converted surface render benchmark
+
+'''
+Composites a full game screen (21 cards, the icons and the logo) from the
+surfaces as loaded from disk and from the same surfaces converted to the
+display format, and reports the time per frame for both
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+'''
+
+import os
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import assets
+import planes
+
+ICONS = ["plus3_icon", "hint_icon", "pause_icon", "start_icon", "restart_icon", "back_icon"]
+
+'''
+Blits every (surface, position) onto screen frames times
+Returns: seconds per frame
+'''
+def run (screen, blits, frames):
+	start = time.perf_counter ()
+	for i in range (frames):
+		screen.fill ((20, 20, 20))
+		for surface, position in blits:
+			screen.blit (surface, position)
+	return (time.perf_counter () - start) / frames
+
+def main (frames=300):
+	display = planes.Display ((1000, 700))
+	screen = pygame.Surface (display.rect.size)
+
+	loaded = []
+	for code in range (0, 81, 4)[:21]:
+		loaded.append ((pygame.image.load ("img/" + assets.card_name (code) + ".png"), (50 + 225*(len (loaded) % 3), 50 + 85*(len (loaded) // 3))))
+	for name in ICONS:
+		loaded.append ((pygame.image.load ("img/" + name + ".png"), (800, 100*ICONS.index (name))))
+	loaded.append ((pygame.image.load ("img/set.jpg"), (750, 50)))
+
+	converted = [(planes.convert_surface (surface), position) for surface, position in loaded]
+
+	loaded_time = run (screen, loaded, frames)
+	converted_time = run (screen, converted, frames)
+	print ("as loaded: {:.2f} ms / frame".format (loaded_time * 1000))
+	print ("converted: {:.2f} ms / frame".format (converted_time * 1000))
+	print ("saved: {:.2f} ms / frame ({:.1f}x)".format ((loaded_time - converted_time) * 1000, loaded_time / converted_time))
+
+if __name__ == "__main__":
+	main ()
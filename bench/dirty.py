@@ -0,0 +1,59 @@
+# Anne LoVerso
+# Python Set Game - dirty rectangle benchmark
+
+'''
+Changes only the time label of a game in play every frame and reports the
+time per frame and the screen area updated, once copying the changed areas
+to the window with pygame.display.update (rects) and once repainting and
+flipping the whole screen
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+Like the game, it reads and creates times_file.txt in the current directory.
+'''
+
+import os
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import planes
+import set as setgame_ui
+
+'''
+Relabels the timer and renders frames times
+Returns: (seconds per frame, pixels updated per frame)
+'''
+def run (screen, label, frames, full):
+	pixels = 0
+	start = time.perf_counter ()
+	for i in range (frames):
+		label.update_text ("Time: 0:{:02d}".format (i % 60))
+		screen.update ()
+		rects = screen.render (force=full)
+		if full:
+			pygame.display.flip ()
+		else:
+			pygame.display.update (rects)
+		pixels += sum (rect.width * rect.height for rect in rects)
+	return (time.perf_counter () - start) / frames, pixels // frames
+
+def main (frames=300):
+	screen = planes.Display ((setgame_ui.WINDOW_WIDTH, setgame_ui.WINDOW_HEIGHT))
+	model = setgame_ui.Model (seed=0)
+	view = setgame_ui.View (model, screen)
+
+	model.start_button.clicked ("left")
+	for i in range (3):
+		model.update (frame_time=0)
+		screen.render ()
+		view.draw ()
+	label = model.game.time_label
+
+	for name, full in [("dirty rects", False), ("full screen", True)]:
+		elapsed, pixels = run (screen, label, frames, full)
+		print ("{}: {:.3f} ms / frame, {} of {} pixels updated".format (
+			name, elapsed * 1000, pixels, screen.rect.width * screen.rect.height))
+
+if __name__ == "__main__":
+	main ()
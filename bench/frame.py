@@ -0,0 +1,82 @@
+# Anne LoVerso
+# Python Set Game - steady-state frame benchmark
+
+'''
+Runs the game loop (model update, render, view) on the home screen, on a game
+in play with two cards clicked and on the pause screen, and reports the time per frame and how
+many Surfaces were created or loaded from disk in steady-state frames
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+Like the game, it reads and creates times_file.txt in the current directory.
+'''
+
+import os
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import planes
+import set as setgame_ui
+
+# counts calls to the wrapped pygame functions while the frames run
+created = {"Surface": 0, "image.load": 0}
+
+def counting (name, function):
+	def wrapper (*args, **kwargs):
+		created[name] += 1
+		return function (*args, **kwargs)
+	return wrapper
+
+def frame (screen, model, view):
+	screen.process ([])
+	model.update (frame_time=0)
+	screen.update ()
+	planes.Plane.render (screen)
+	view.draw ()
+
+'''
+Runs frames on the current screen, returns seconds per frame
+Surfaces created meanwhile are counted in created
+'''
+def run (screen, model, view, frames):
+	# warm up, so everything created on the first frames exists
+	for i in range (10):
+		frame (screen, model, view)
+
+	surface, load = pygame.Surface, pygame.image.load
+	pygame.Surface = counting ("Surface", surface)
+	pygame.image.load = counting ("image.load", load)
+	for name in created:
+		created[name] = 0
+	try:
+		start = time.perf_counter ()
+		for i in range (frames):
+			frame (screen, model, view)
+		return (time.perf_counter () - start) / frames
+	finally:
+		pygame.Surface, pygame.image.load = surface, load
+
+def main (frames=300):
+	screen = planes.Display ((setgame_ui.WINDOW_WIDTH, setgame_ui.WINDOW_HEIGHT))
+	model = setgame_ui.Model (seed=0)
+	view = setgame_ui.View (model, screen)
+
+	elapsed = run (screen, model, view, frames)
+	print ("home screen: {:.2f} ms / frame, {:.2f} Surfaces created, {:.2f} images loaded per frame".format (
+		elapsed * 1000, created["Surface"] / float (frames), created["image.load"] / float (frames)))
+
+	model.start_button.clicked ("left")
+	model.game.in_play_cards[0].been_clicked = True
+	model.game.in_play_cards[4].been_clicked = True
+	elapsed = run (screen, model, view, frames)
+	print ("in play, 2 cards clicked: {:.2f} ms / frame, {:.2f} Surfaces created, {:.2f} images loaded per frame".format (
+		elapsed * 1000, created["Surface"] / float (frames), created["image.load"] / float (frames)))
+
+	model.game.pause_button.clicked ("left")
+	elapsed = run (screen, model, view, frames)
+	print ("paused: {:.2f} ms / frame, {:.2f} Surfaces created, {:.2f} images loaded per frame".format (
+		elapsed * 1000, created["Surface"] / float (frames), created["image.load"] / float (frames)))
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,77 @@
+# Anne LoVerso
+# Python Set Game - mouseover highlight benchmark
+
+'''
+Fills the screen with 400 highlightable buttons, half of them with per-pixel
+alpha, and reports the time to recomposite the whole screen with no button
+highlighted, with all of them highlighted through the cached overlays, and with
+the overlays computed anew every frame as before they were cached
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+'''
+
+import os
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import planes
+
+WIDTH, HEIGHT = 1000, 700
+
+'''
+Returns: the composite of screen, drawn from scratch
+'''
+def recomposite (screen):
+	screen.rendersurface = None
+	planes.Plane.render (screen)
+	return screen.rendersurface
+
+'''
+Recomposites screen frames times, calling before_frame () before each
+Returns: (seconds per frame, the last composite as a string of bytes)
+'''
+def run (screen, frames, before_frame):
+	start = time.perf_counter ()
+	for i in range (frames):
+		before_frame ()
+		surface = recomposite (screen)
+	return (time.perf_counter () - start) / frames, pygame.image.tobytes (surface, "RGB")
+
+def main (frames=50):
+	screen = planes.Display ((WIDTH, HEIGHT))
+	buttons = []
+	for i in range (400):
+		rect = pygame.Rect ((i % 20) * 50, (i // 20) * 35, 48, 33)
+		button = planes.Plane ("button" + str (i), rect, highlight=True)
+		if i % 2:
+			button.image = pygame.Surface (rect.size, flags=pygame.SRCALPHA)
+			button.image.fill ((40, 120, 200, 160))
+		else:
+			button.image.fill ((200, 120, 40))
+		screen.sub (button)
+		buttons.append (button)
+	recomposite (screen)
+
+	def hover (flag):
+		for button in buttons:
+			button.mouseover = flag
+
+	def drop_overlays ():
+		for button in buttons:
+			button._highlight_overlay = None
+
+	hover (False)
+	plain, plain_pixels = run (screen, frames, lambda: None)
+	hover (True)
+	cached, cached_pixels = run (screen, frames, lambda: None)
+	uncached, uncached_pixels = run (screen, frames, drop_overlays)
+	assert cached_pixels == uncached_pixels
+
+	print ("no highlight: {:.2f} ms / frame".format (plain * 1000))
+	print ("400 highlights, cached overlays: {:.2f} ms / frame".format (cached * 1000))
+	print ("400 highlights, overlays made every frame: {:.2f} ms / frame".format (uncached * 1000))
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,61 @@
+# Anne LoVerso
+# Python Set Game - hit-testing benchmark
+
+'''
+Looks up the plane under random points on a display covered by a grid of
+overlapping planes, testing every subplane and through the spatial index
+(Plane.use_spatial_index), checks both find the same planes and reports the
+time per lookup for several plane counts
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+'''
+
+import os
+import random
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import planes
+
+WIDTH, HEIGHT = 1000, 700
+
+'''
+Fills screen with count planes in a grid, each overlapping its neighbours
+'''
+def fill (screen, count):
+	screen.remove_all ()
+	columns = int ((count * WIDTH / float (HEIGHT)) ** .5) + 1
+	width = WIDTH // columns
+	for i in range (count):
+		rect = pygame.Rect ((i % columns) * width, (i // columns) * width, width + 10, width + 10)
+		screen.sub (planes.Plane ("plane" + str (i), rect))
+
+'''
+Returns: (seconds per lookup, names of the planes found)
+'''
+def run (screen, points):
+	found = []
+	start = time.perf_counter ()
+	for point in points:
+		found.append (screen.get_plane_at (point)[0].name)
+	return (time.perf_counter () - start) / len (points), found
+
+def main (lookups=20000):
+	screen = planes.Display ((WIDTH, HEIGHT))
+	rng = random.Random (0)
+	points = [(rng.randrange (WIDTH), rng.randrange (HEIGHT)) for i in range (lookups)]
+
+	for count in [30, 100, 500, 2000]:
+		fill (screen, count)
+		screen.spatial_index = None
+		linear, linear_found = run (screen, points)
+		screen.use_spatial_index ()
+		indexed, indexed_found = run (screen, points)
+		assert indexed_found == linear_found
+		print ("{} planes: every plane {:.2f} us / lookup, spatial index {:.2f} us / lookup ({:.1f}x)".format (
+			count, linear * 1e6, indexed * 1e6, linear / indexed))
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,111 @@
+# Anne LoVerso
+# Python Set Game - layered compositing benchmark
+
+'''
+Moves one plane by a pixel every frame and reports the time per frame with
+all other planes blitted one by one, and with them flattened into cached
+static layers by Display.use_layers
+Two scenes: the time box of a game in play, which covers the whole window and
+creeps down under the cards, and 400 small sprites, half of them with
+per-pixel alpha, under a moving window-sized plane
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+Like the game, it reads and creates times_file.txt in the current directory.
+'''
+
+import os
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import planes
+import set as setgame_ui
+
+'''
+Moves mover down a pixel and renders screen frames times
+Returns: (seconds per frame, the last frame as a string of bytes)
+'''
+def run (screen, mover, frames):
+	start = time.perf_counter ()
+	for i in range (frames):
+		mover.rect.y += 1
+		if mover.rect.y > 0:
+			mover.rect.y = -mover.rect.height // 2
+		planes.Plane.render (screen)
+	elapsed = (time.perf_counter () - start) / frames
+	return elapsed, pygame.image.tobytes (screen.rendersurface, "RGB")
+
+'''
+Returns: the largest difference of a color channel between two frames
+'''
+def difference (a, b):
+	return max (abs (x - y) for x, y in zip (a, b))
+
+'''
+Builds a fresh scene twice, plain and layered, and reports both
+'''
+def compare (title, build, frames):
+	results = []
+	for layers in (False, True):
+		screen, mover = build ()
+		if layers:
+			screen.use_layers (static_after=2)
+		# let the layers settle, then take the best of three runs
+		run (screen, mover, 5)
+		runs = [run (screen, mover, frames) for i in range (3)]
+		results.append ((min (runs)[0], runs[-1][1]))
+	(plain, plain_pixels), (layered, layered_pixels) = results
+	assert difference (plain_pixels, layered_pixels) <= 1
+	print ("{}: {:.2f} ms / frame plain, {:.2f} ms / frame layered".format (
+		title, plain * 1000, layered * 1000))
+
+def build_game ():
+	screen = planes.Display ((setgame_ui.WINDOW_WIDTH, setgame_ui.WINDOW_HEIGHT))
+	model = setgame_ui.Model (seed=0)
+	view = setgame_ui.View (model, screen)
+
+	model.easy_button.clicked ("left")
+	model.start_button.clicked ("left")
+	for i in range (3):
+		model.update (frame_time=0)
+		planes.Plane.render (screen)
+		view.draw ()
+	# the same time in both scenes, for comparing them
+	model.game.time_label.update_text ("Time: 0:00")
+	screen.update ()
+	time_box = model.game.time_box
+	time_box.rect.y = -setgame_ui.WINDOW_HEIGHT // 2
+	return screen, time_box
+
+def build_sprites ():
+	screen = planes.Display ((1000, 700))
+	mover = planes.Plane ("mover", pygame.Rect (0, -600, 1000, 700))
+	mover.image.fill ((120, 40, 90))
+	screen.sub (mover)
+	for i in range (400):
+		rect = pygame.Rect ((i % 20) * 50, (i // 20) * 35, 48, 33)
+		sprite = planes.Plane ("sprite" + str (i), rect)
+		if i % 2:
+			sprite.image = pygame.Surface (rect.size, flags=pygame.SRCALPHA)
+			sprite.image.fill ((40, 120, 200, 160))
+		else:
+			sprite.image.fill ((200, 120, 40))
+		screen.sub (sprite)
+	return screen, mover
+
+def build_cursor ():
+	screen, mover = build_sprites ()
+	screen.remove ("mover")
+	cursor = planes.Plane ("cursor", pygame.Rect (0, 0, 100, 100))
+	cursor.image.fill ((120, 40, 90))
+	screen.sub (cursor)
+	return screen, cursor
+
+def main (frames=100):
+	compare ("time box", build_game, frames)
+	compare ("400 sprites", build_sprites, frames)
+	compare ("cursor over 400 sprites", build_cursor, frames)
+
+if __name__ == "__main__":
+	main ()
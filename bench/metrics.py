@@ -0,0 +1,46 @@
+# Anne LoVerso
+# Python Set Game - metrics sink benchmark
+
+'''
+Reports the time Stats.update takes per frame without a metrics sink and
+with one writing JSON lines and CSV, and how many records were dropped
+The loop makes records far faster than any game draws frames, so the writer
+thread falls behind and the sink drops batches instead of blocking.
+The files are written to a temporary directory and removed afterwards.
+'''
+
+import os
+import tempfile
+import time
+
+import planes
+
+'''
+Calls Stats.update frames times
+Returns: seconds per call
+'''
+def run (stats, frames):
+	start = time.perf_counter ()
+	for i in range (frames):
+		stats.blit_skip = i % 7
+		stats.update (None)
+	return (time.perf_counter () - start) / frames
+
+def main (frames=100000):
+	stats = planes.Stats ()
+	print ("no sink: {:.2f} us / frame".format (run (stats, frames) * 1e6))
+
+	with tempfile.TemporaryDirectory () as directory:
+		for name in ("metrics.jsonl", "metrics.csv"):
+			path = os.path.join (directory, name)
+			stats.sink = planes.MetricsSink (path)
+			elapsed = run (stats, frames)
+			stats.sink.close ()
+			with open (path) as metrics_file:
+				lines = sum (1 for line in metrics_file)
+			print ("{}: {:.2f} us / frame, {} lines written, {} records dropped".format (
+				name, elapsed * 1e6, lines, stats.sink.dropped))
+			stats.sink = None
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,79 @@
+# Anne LoVerso
+# Python Set Game - render thread benchmark
+
+'''
+Runs the game loop with the time box creeping down a pixel every frame and
+reports the time per frame, the time Display.render keeps the main thread
+busy and the compositing time on the render thread, once compositing in
+Display.render and once on a RenderThread
+The loop is ordered like the one in set.py, so the render thread composites
+a frame while the model and view prepare the next one. The overlap only pays
+off with more than one CPU core.
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+Like the game, it reads and creates times_file.txt in the current directory.
+'''
+
+import os
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import planes
+import set as setgame_ui
+
+'''
+Runs frames passes of the game loop
+Returns: (seconds per frame, seconds in Display.render per frame,
+          seconds on the render thread per frame)
+'''
+def run (screen, model, view, frames):
+	time_box = model.game.time_box
+	in_render = 0.0
+	on_thread = 0.0
+	pending_rects = []
+	start = time.perf_counter ()
+	for i in range (frames):
+		time_box.rect.y += 1
+		if time_box.rect.y > 0:
+			time_box.rect.y = -setgame_ui.WINDOW_HEIGHT // 2
+		screen.process ([])
+		# the time box is moved by hand above
+		model.update (frame_time=0)
+		view.draw ()
+		screen.wait_render ()
+		on_thread += planes.STATS.render_thread_time
+		pygame.display.update (pending_rects)
+		screen.update ()
+		render_start = time.perf_counter ()
+		dirty_rects = screen.render ()
+		in_render += time.perf_counter () - render_start
+		if screen.render_thread is not None:
+			pending_rects = dirty_rects
+		else:
+			pygame.display.update (dirty_rects)
+	screen.wait_render ()
+	elapsed = time.perf_counter () - start
+	return elapsed / frames, in_render / frames, on_thread / frames
+
+def main (frames=300):
+	for threaded in (False, True):
+		screen = planes.Display ((setgame_ui.WINDOW_WIDTH, setgame_ui.WINDOW_HEIGHT))
+		model = setgame_ui.Model (seed=0)
+		view = setgame_ui.View (model, screen)
+		if threaded:
+			screen.use_render_thread ()
+		planes.STATS.render_thread_time = 0
+
+		model.easy_button.clicked ("left")
+		model.start_button.clicked ("left")
+		run (screen, model, view, 5)
+		elapsed, in_render, on_thread = run (screen, model, view, frames)
+
+		print ("{}: {:.2f} ms / frame, {:.2f} ms in Display.render, {:.2f} ms on the render thread".format (
+			"render thread" if threaded else "no render thread",
+			elapsed * 1000, in_render * 1000, on_thread * 1000))
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,58 @@
+# Anne LoVerso
+# Python Set Game - plane memory and attribute access benchmark
+
+'''
+Builds a scene of 10000 planes and one of 10000 cards, and reports the Python
+memory per object (measured with tracemalloc, so the pixels of the surfaces,
+which SDL allocates, are not included), the time to read an attribute and the
+time to look up a missing one
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+'''
+
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import planes
+import set as setgame_ui
+
+'''
+Returns: (objects made by make (i) for i in range (count), bytes per object)
+'''
+def build (make, count):
+	tracemalloc.start ()
+	before = tracemalloc.get_traced_memory ()[0]
+	objects = [make (i) for i in range (count)]
+	after = tracemalloc.get_traced_memory ()[0]
+	tracemalloc.stop ()
+	return objects, (after - before) / float (count)
+
+'''
+Returns: seconds per getattr (obj, name, None) over all objects, rounds times
+'''
+def access (objects, name, rounds=20):
+	start = time.perf_counter ()
+	for i in range (rounds):
+		for obj in objects:
+			getattr (obj, name, None)
+	return (time.perf_counter () - start) / (rounds * len (objects))
+
+def main (count=10000):
+	screen = planes.Display ((setgame_ui.WINDOW_WIDTH, setgame_ui.WINDOW_HEIGHT))
+	rect = pygame.Rect (0, 0, 1, 1)
+	scenes = [
+		("planes", lambda i: planes.Plane ("plane" + str (i), pygame.Rect (rect))),
+		("cards", lambda i: setgame_ui.Card ("card" + str (i), "red", "oval", 1 + i % 3, "empty"))]
+
+	for name, make in scenes:
+		objects, size = build (make, count)
+		print ("{} {}: {:.0f} bytes / object, rect {:.1f} ns, mouseover {:.1f} ns, missing attribute {:.1f} ns".format (
+			count, name, size, access (objects, "rect") * 1e9, access (objects, "mouseover") * 1e9,
+			access (objects, "missing") * 1e9))
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,53 @@
+# Anne LoVerso
+# Python Set Game - subplane bookkeeping benchmark
+
+'''
+Adds 10000 planes to a parent plane, moves each of them behind a random other
+one with insert_after, removes them in random order, then adds them again and
+removes them all with remove_all, and reports the time of each step
+'''
+
+import random
+import time
+
+import pygame
+
+import planes
+
+'''
+Returns: seconds taken by function ()
+'''
+def timed (function):
+	start = time.perf_counter ()
+	function ()
+	return time.perf_counter () - start
+
+def main (count=10000):
+	rng = random.Random (0)
+	parent = planes.Plane ("parent", pygame.Rect (0, 0, 1000, 700))
+	children = [planes.Plane ("plane" + str (i), pygame.Rect (i % 1000, i % 700, 10, 10)) for i in range (count)]
+	names = [plane.name for plane in children]
+	shuffled = list (names)
+	rng.shuffle (shuffled)
+
+	def sub_all ():
+		for plane in children:
+			parent.sub (plane)
+
+	def reorder ():
+		for plane, after in zip (children, shuffled):
+			if after != plane.name:
+				parent.sub (plane, insert_after=after)
+
+	def remove_shuffled ():
+		for name in shuffled:
+			parent.remove (name)
+
+	steps = [("sub", sub_all), ("sub with insert_after", reorder), ("remove", remove_shuffled),
+			 ("sub again", sub_all), ("remove_all", parent.remove_all)]
+	for name, function in steps:
+		print ("{} {} planes: {:.1f} ms".format (name, count, timed (function) * 1000))
+	assert len (parent.subplanes) == 0
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,63 @@
+# Anne LoVerso
+# Python Set Game - text cache benchmark
+
+'''
+Renders the label texts of a game (sets found, hints, deck and the timer for
+every second of ten minutes) with pygame.font.Font.render and twice through a
+planes.gui.TextCache, and reports the time per text and the cache hits
+A miss costs more than a plain render mostly because the cache keeps its
+Surfaces, so each one takes fresh memory instead of the block the last one
+freed. Rendering while keeping the Surfaces in a list shows that part alone.
+Uses the dummy SDL video driver unless SDL_VIDEODRIVER is set.
+'''
+
+import os
+import time
+
+os.environ.setdefault ("SDL_VIDEODRIVER", "dummy")
+
+import planes
+import planes.gui
+import set as setgame_ui
+
+'''
+Returns: the label texts shown during one game
+'''
+def game_texts ():
+	texts = ["Sets: " + str (n) for n in range (28)]
+	texts += ["Hints Remaining: " + str (n) for n in range (setgame_ui.NUM_HINTS, -1, -1)]
+	texts += ["Deck: " + str (n) for n in range (69, -1, -3)]
+	texts += ["Time: " + setgame_ui.format_secs (secs) for secs in range (600)]
+	return texts
+
+'''
+Renders every text with render (font, text)
+Returns: seconds per text
+'''
+def run (render, font, texts):
+	start = time.perf_counter ()
+	for text in texts:
+		render (font, text)
+	return (time.perf_counter () - start) / len (texts)
+
+def main ():
+	planes.Display ((setgame_ui.WINDOW_WIDTH, setgame_ui.WINDOW_HEIGHT))
+	font = setgame_ui.FONT_BIG
+	texts = game_texts ()
+
+	uncached = run (lambda font, text: font.render (text, True, (255, 255, 255)), font, texts)
+	cache = planes.gui.TextCache (max_size=len (texts))
+	render = lambda font, text: cache.render (font, text, True, (255, 255, 255))
+	first = run (render, font, texts)
+	again = run (render, font, texts)
+	# after the cache, so this too has to take fresh memory for its Surfaces
+	kept = []
+	uncached_kept = run (lambda font, text: kept.append (font.render (text, True, (255, 255, 255))), font, texts)
+	print ("font.render: {:.2f} us / text".format (uncached * 1e6))
+	print ("font.render, Surfaces kept: {:.2f} us / text".format (uncached_kept * 1e6))
+	print ("text cache, first game: {:.2f} us / text".format (first * 1e6))
+	print ("text cache, next game: {:.2f} us / text ({:.0f}x)".format (again * 1e6, uncached / again))
+	print ("{} hits, {} misses".format (cache.hits, cache.misses))
+
+if __name__ == "__main__":
+	main ()
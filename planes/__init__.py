@@ -24,13 +24,401 @@
 # TODO: add Plane.offset(x, y) to offset all subplanes - without touching their rect -> only while rendering
 # TODO: Surface.get_flags has all sorts of interesting information to optimise performance.
 # TODO: Planes *so* needs live performance reporting. Maybe not via log file, but as some sort of a live display via TTY or socket.
-# TODO: replace Plane.subplanes and Planes.subplanes_list with collections.OrderedDict and OrderedDict.keys()?
 
+import atexit
+import collections
+import csv
+import json
 import pygame
+import queue
+import threading
 import time
 
 VERSION = "0.6.0"
 
+# Callbacks waiting for a Pygame display to exist. See when_display_ready().
+#
+_display_ready_callbacks = []
+
+def convert_surface(surface):
+    """Return a copy of the Surface given in the pixel format of the Pygame display.
+
+       Blitting a Surface in display format avoids a per-pixel format
+       conversion on every blit. Surfaces with per-pixel alpha keep it through
+       Surface.convert_alpha(), all others use Surface.convert().
+
+       A Pygame display must exist, see when_display_ready().
+    """
+
+    if surface.get_flags() & pygame.SRCALPHA:
+
+        return surface.convert_alpha()
+
+    return surface.convert()
+
+def when_display_ready(callback):
+    """Call callback() as soon as a Pygame display exists.
+
+       If there is a display already, callback() is called right away. Else it
+       is called by Display.__init__() once the display has been set up.
+
+       This is meant for code that loads Surfaces before there is a display, to
+       run convert_surface() on them as soon as possible.
+    """
+
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+
+        callback()
+
+    else:
+        _display_ready_callbacks.append(callback)
+
+    return
+
+def _can_redraw_partially(image):
+    """Return True if parts of a rendersurface can be restored by blitting image over them.
+
+       This does not hold for images with per-pixel alpha, surface alpha or a
+       colorkey, since these would be blended with the old content.
+    """
+
+    return (not image.get_flags() & pygame.SRCALPHA
+            and image.get_alpha() is None
+            and image.get_colorkey() is None)
+
+def _premultiplied(surface):
+    """Return a copy of the SRCALPHA Surface given with its colors multiplied by alpha.
+    """
+
+    if hasattr(surface, "premul_alpha"):
+
+        # premul_alpha() does not honour the pitch of subsurfaces
+        #
+        if surface.get_parent() is not None:
+
+            surface = surface.copy()
+
+        return surface.premul_alpha()
+
+    # Pygame before 2.1.4
+    #
+    return pygame.image.fromstring(pygame.image.tostring(surface, "RGBA_PREMULT"),
+                                   surface.get_size(),
+                                   "RGBA")
+
+def _can_flatten(surface):
+    """Return True if surface can be flattened into a layer, see Plane.flatten().
+
+       This holds for opaque Surfaces and for Surfaces with only per-pixel
+       alpha, not for those with surface alpha or a colorkey.
+    """
+
+    if surface.get_colorkey() is not None:
+
+        return False
+
+    if surface.get_flags() & pygame.SRCALPHA:
+
+        return surface.get_alpha() in (None, 255)
+
+    return surface.get_alpha() is None
+
+def _merge_rects(rects, bounds):
+    """Return a list of Rects covering all Rects given, clipped to bounds.
+
+       Overlapping Rects are merged into their union, so no area is redrawn
+       twice.
+    """
+
+    merged = []
+
+    for rect in rects:
+
+        rect = rect.clip(bounds)
+
+        if not rect.width or not rect.height:
+
+            continue
+
+        # Merging may make the union overlap Rects merged before, so repeat
+        # until it is disjoint from all of them.
+        #
+        index = rect.collidelist(merged)
+
+        while index != -1:
+
+            rect.union_ip(merged.pop(index))
+
+            index = rect.collidelist(merged)
+
+        merged.append(rect)
+
+    return merged
+
+class SubplaneDict:
+    """An ordered dict of Planes by name, for Plane.subplanes.
+
+       The Planes are kept in a doubly linked list in render order, so that
+       appending, inserting after a given name and removing are all O(1).
+       Iterating yields the names in order, like a dict yields its keys. It
+       goes over a tuple of the Planes, built on the first iteration after a
+       change, so the many iterations between changes cost no more than
+       iterating a list.
+    """
+
+    def __init__(self):
+        """Initialise an empty SubplaneDict.
+        """
+
+        # {name: [previous name, next name, plane]}
+        #
+        self._nodes = {}
+
+        self._first = None
+
+        self._last = None
+
+        # Tuple of the Planes in order, None if outdated
+        #
+        self._planes = None
+
+        return
+
+    def __len__(self):
+        """Return the number of Planes.
+        """
+
+        return len(self._nodes)
+
+    def __contains__(self, name):
+        """Return True if there is a Plane of that name.
+        """
+
+        return name in self._nodes
+
+    def __getitem__(self, name):
+        """Return the Plane of that name, raise KeyError if there is none.
+        """
+
+        return self._nodes[name][2]
+
+    def get(self, name, default = None):
+        """Return the Plane of that name, or default if there is none.
+        """
+
+        node = self._nodes.get(name)
+
+        if node is None:
+
+            return default
+
+        return node[2]
+
+    def values(self):
+        """Return a tuple of the Planes in order.
+        """
+
+        if self._planes is None:
+
+            planes = []
+
+            nodes = self._nodes
+
+            name = self._first
+
+            while name is not None:
+
+                node = nodes[name]
+
+                planes.append(node[2])
+
+                name = node[1]
+
+            self._planes = tuple(planes)
+
+        return self._planes
+
+    def __iter__(self):
+        """Return an iterator over the names of the Planes in order.
+        """
+
+        return iter([plane.name for plane in self.values()])
+
+    def __reversed__(self):
+        """Return an iterator over the names of the Planes in reverse order.
+        """
+
+        return iter([plane.name for plane in reversed(self.values())])
+
+    def keys(self):
+        """Return an iterator over the names of the Planes in order.
+        """
+
+        return iter(self)
+
+    def items(self):
+        """Return a list of (name, Plane) tuples in order.
+        """
+
+        return [(plane.name, plane) for plane in self.values()]
+
+    def previous(self, name):
+        """Return the name of the Plane before the one given, or None if it is the first.
+        """
+
+        return self._nodes[name][0]
+
+    def insert(self, plane, after = None):
+        """Add the Plane given right after the Plane named after, or at the end if after is None.
+
+           A Plane of the same name must not be present.
+        """
+
+        if after is None:
+
+            after = self._last
+
+        if after is None:
+
+            following = None
+
+            self._first = plane.name
+
+        else:
+            following = self._nodes[after][1]
+
+            self._nodes[after][1] = plane.name
+
+        if following is None:
+
+            self._last = plane.name
+
+        else:
+            self._nodes[following][0] = plane.name
+
+        self._nodes[plane.name] = [after, following, plane]
+
+        self._planes = None
+
+        return
+
+    def __delitem__(self, name):
+        """Remove the Plane of that name, raise KeyError if there is none.
+        """
+
+        previous, following, plane = self._nodes.pop(name)
+
+        if previous is None:
+
+            self._first = following
+
+        else:
+            self._nodes[previous][1] = following
+
+        if following is None:
+
+            self._last = previous
+
+        else:
+            self._nodes[following][0] = previous
+
+        self._planes = None
+
+        return
+
+class SpatialIndex:
+    """A uniform grid for looking up the subplanes of a Plane by position.
+
+       The grid divides the Plane into square cells and maps each cell to the
+       names of the subplanes overlapping it. See Plane.use_spatial_index().
+
+       Attributes:
+
+       SpatialIndex.cell_size
+           Width and height of a cell in pixels.
+
+       SpatialIndex.cells
+           A dict mapping (column, row) tuples to sets of subplane names.
+
+       SpatialIndex.rects
+           A dict mapping subplane names to copies of the Rects they have been
+           indexed with.
+    """
+
+    def __init__(self, cell_size = 64):
+        """Initialise an empty index.
+        """
+
+        self.cell_size = cell_size
+
+        self.cells = {}
+
+        self.rects = {}
+
+        return
+
+    def cells_of(self, rect):
+        """Return a list of (column, row) tuples of the cells overlapped by rect.
+        """
+
+        if not rect.width or not rect.height:
+
+            return []
+
+        size = self.cell_size
+
+        return [(column, row)
+                for column in range(rect.left // size, (rect.right - 1) // size + 1)
+                for row in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def update(self, name, rect):
+        """Index the subplane name at rect, unless it already is.
+        """
+
+        if self.rects.get(name) == rect:
+
+            return
+
+        self.remove(name)
+
+        self.rects[name] = pygame.Rect(rect)
+
+        for cell in self.cells_of(rect):
+
+            self.cells.setdefault(cell, set()).add(name)
+
+        return
+
+    def remove(self, name):
+        """Remove the subplane name from the index, if present.
+        """
+
+        rect = self.rects.pop(name, None)
+
+        if rect is not None:
+
+            for cell in self.cells_of(rect):
+
+                names = self.cells[cell]
+
+                names.discard(name)
+
+                if not names:
+
+                    del self.cells[cell]
+
+        return
+
+    def names_at(self, coordinates):
+        """Return the names of the subplanes indexed in the cell at coordinates.
+
+           These are candidates only: the caller must test the current Rects.
+        """
+
+        return self.cells.get((coordinates[0] // self.cell_size,
+                               coordinates[1] // self.cell_size),
+                              ())
+
 class Plane:
     """A Plane is a surface in a hierarchy of surfaces.
        Concept-wise it bears some similarities to pygame.sprite.Sprite.
@@ -57,10 +445,12 @@ class Plane:
            The parent plane. Initially None.
 
        Plane.subplanes
-           Dict of subplanes, identified by their name.
+           A SubplaneDict of subplanes, identified by their name, in order of
+           their addition.
 
        Plane.subplanes_list
-           A list of subplane names, in order of their addition
+           A new list of subplane names, in order of their addition. Kept for
+           compatibility, iterate Plane.subplanes instead.
 
        Plane.draggable
            Boolean flag. If True, this Plane can be dragged and dropped.
@@ -80,6 +470,24 @@ class Plane:
        Plane.last_rect
            Caches rect at last rendering for efficiency.
 
+       Plane.drawn_rect
+           The rect this Plane has been drawn at on the parent's
+           rendersurface, or None if it is not drawn there.
+
+       Plane.dirty_rects
+           List of Rects, relative to this Plane, that changed in the last
+           call to Plane.render().
+
+       Plane.spatial_index
+           A SpatialIndex of the subplanes, used by Plane.get_plane_at(), or
+           None. Initially None, see Plane.use_spatial_index().
+
+       Plane.static
+           Layer assignment of this Plane when its parent composites in
+           layers, see Plane.use_layers(). True for the static layers, False
+           for the dynamic ones, None to infer it from how often this Plane
+           changes. Initially None.
+
        Plane.left_click_callback
            Callback function when this plane has been clicked with the left
            mouse button.
@@ -115,8 +523,59 @@ class Plane:
        Plane.offset
           A tuple (x, y) describing the offset to the sync master plane.
           Initially None.
+
+       Class attributes:
+
+       Plane.scene_generation
+          A counter, increased whenever a subplane is added or removed
+          anywhere, or found moved when rendering. If it did not change, the
+          planes are where they were.
+
+       The attributes of a Plane live in __slots__, so Planes are smaller and
+       faster to access than with an instance dict. Subclasses that do not
+       define __slots__ get an instance dict and may add any attribute, as
+       before.
     """
 
+    __slots__ = ("name",
+                 "image",
+                 "rendersurface",
+                 "rect",
+                 "draggable",
+                 "grab",
+                 "highlight",
+                 "mouseover",
+                 "parent",
+                 "subplanes",
+                 "last_image_id",
+                 "last_rect",
+                 "drawn_rect",
+                 "dirty_rects",
+                 "_damage",
+                 "spatial_index",
+                 "_subplane_order",
+                 "_highlight_overlay",
+                 "_highlight_source",
+                 "static",
+                 "_changed_at",
+                 "_layers",
+                 "_static_after",
+                 "_render_count",
+                 "_layout",
+                 "_promote_at",
+                 "left_click_callback",
+                 "right_click_callback",
+                 "up_click_callback",
+                 "down_click_callback",
+                 "dropped_upon_callback",
+                 "sync_master_plane",
+                 "offset",
+                 # Set by Display on the copy of a dragged Plane
+                 #
+                 "source")
+
+    scene_generation = 0
+
     # TODO: it should be possible to initialise a Plane with a Pygame Surface, for convenvience.
     #
     def __init__(self,
@@ -178,8 +637,7 @@ class Plane:
         #
         self.parent = None
 
-        self.subplanes = {}
-        self.subplanes_list = []
+        self.subplanes = SubplaneDict()
 
         # Caches for efficient rendering
         #
@@ -189,6 +647,45 @@ class Plane:
         #
         self.last_rect = None
 
+        # Bookkeeping for redrawing only the changed areas.
+        # Plane._damage collects areas of removed subplanes until the next
+        # call to render().
+        #
+        self.drawn_rect = None
+        self.dirty_rects = []
+        self._damage = []
+
+        # Optional index for hit-testing, see use_spatial_index().
+        # Plane._subplane_order caches the position of each name in
+        # Plane.subplanes for it, None if outdated.
+        #
+        self.spatial_index = None
+        self._subplane_order = None
+
+        # Cache for highlight_overlay(), and id of the rendersurface it has
+        # been made from
+        #
+        self._highlight_overlay = None
+        self._highlight_source = None
+
+        # Layered compositing, see use_layers().
+        # Plane._changed_at is the Plane._render_count of the parent when
+        # this Plane last changed. Plane._layers maps keys of static runs of
+        # subplanes to their cached layers, None if not compositing in
+        # layers. Plane._layout caches the result of composite_layers() as
+        # (id of image, displayrect, dynamic subplanes by id, base, layers)
+        # until a static subplane changes, the subplanes change or
+        # Plane._render_count reaches Plane._promote_at, when a dynamic
+        # subplane may turn static.
+        #
+        self.static = None
+        self._changed_at = 0
+        self._layers = None
+        self._static_after = 0
+        self._render_count = 0
+        self._layout = None
+        self._promote_at = 0
+
         # Save callbacks
         #
         self.left_click_callback = left_click_callback
@@ -208,7 +705,7 @@ class Plane:
         """Remove the Plane given from its current parent and add it as a subplane of this Plane.
 
            If insert_after is given, the new subplane will be inserted
-           immediately after the subplane with that name in Plane.subplanes_list,
+           immediately after the subplane with that name in Plane.subplanes,
            else it will simply be appended.
 
            If a subplane with the same name already exists, it is silently
@@ -219,22 +716,39 @@ class Plane:
 
             plane.parent.remove(plane.name)
 
-        if plane.name in self.subplanes_list:
+        if plane.name in self.subplanes:
+
+            # A replaced Plane must be erased
+            #
+            replaced = self.subplanes[plane.name]
 
-            del self.subplanes_list[self.subplanes_list.index(plane.name)]
+            if replaced.drawn_rect is not None:
 
-        if insert_after is not None and insert_after in self.subplanes_list:
+                self._damage.append(replaced.drawn_rect)
 
-            self.subplanes_list.insert(self.subplanes_list.index(insert_after) + 1,
-                                       plane.name)
+                replaced.drawn_rect = None
 
-        else:
-            self.subplanes_list.append(plane.name)
+            del self.subplanes[plane.name]
+
+        if insert_after is not None and insert_after in self.subplanes:
+
+            self.subplanes.insert(plane, after = insert_after)
 
-        self.subplanes[plane.name] = plane
+        else:
+            self.subplanes.insert(plane)
 
         plane.parent = self
 
+        self._layout = None
+
+        Plane.scene_generation += 1
+
+        if self.spatial_index is not None:
+
+            self.spatial_index.update(plane.name, plane.rect)
+
+            self._subplane_order = None
+
         # Reset to None to trigger a rendering
         #
         plane.last_rect = None
@@ -255,235 +769,751 @@ class Plane:
         """Remove subplane by name or Plane instance.
         """
 
-        # Accept Plane name as well as Plane instance
-        #
-        if isinstance(plane_identifier, Plane):
+        # Accept Plane name as well as Plane instance
+        #
+        if isinstance(plane_identifier, Plane):
+
+            name = plane_identifier.name
+
+        else:
+            name = plane_identifier
+
+        if name in self.subplanes:
+
+            plane = self.subplanes[name]
+
+            # The area the Plane has been drawn at must be redrawn
+            #
+            if plane.drawn_rect is not None:
+
+                self._damage.append(plane.drawn_rect)
+
+                plane.drawn_rect = None
+
+            plane.parent = None
+            del self.subplanes[name]
+
+            self._layout = None
+
+            Plane.scene_generation += 1
+
+            if self.spatial_index is not None:
+
+                self.spatial_index.remove(name)
+
+                self._subplane_order = None
+
+        return
+
+    def remove_all(self):
+        """Convenience method to call Plane.remove() for all subplanes.
+        """
+
+        # Make a copy since subplanes will be changed by remove()
+        #
+        for name in list(self.subplanes):
+
+            self.remove(name)
+
+        # We do not need to worry about rendering here: once all subplanes
+        # are gone, render() will point the rendersurface to image and
+        # redraw.
+
+        return
+
+    def sync_subplanes(self, plane_list):
+        """Make the Planes in plane_list the subplanes of this Plane, in that order.
+
+           Only the difference to the current subplanes is applied: Planes not
+           in plane_list are removed, and Planes that are missing or out of
+           place are added or moved. If nothing changed, nothing is done, so
+           the render caches stay valid.
+
+           A subplane is replaced if plane_list holds a different Plane of
+           the same name.
+
+           Returns True if the subplanes changed, False otherwise.
+        """
+
+        if (len(plane_list) == len(self.subplanes)
+            and all(self.subplanes.get(plane.name) is plane for plane in plane_list)
+            and [plane.name for plane in plane_list] == list(self.subplanes)):
+
+            return False
+
+        wanted = dict((plane.name, plane) for plane in plane_list)
+
+        for name in list(self.subplanes):
+
+            if wanted.get(name) is not self.subplanes[name]:
+
+                self.remove(name)
+
+        # Place each Plane right after its predecessor. Once all are placed,
+        # they form one block in the requested order.
+        #
+        previous_name = None
+
+        for plane in plane_list:
+
+            if self.subplanes.get(plane.name) is not plane:
+
+                self.sub(plane, insert_after = previous_name)
+
+            elif (previous_name is not None
+                  and self.subplanes.previous(plane.name) != previous_name):
+
+                self.sub(plane, insert_after = previous_name)
+
+            previous_name = plane.name
+
+        return True
+
+    @property
+    def subplanes_list(self):
+        """A new list of subplane names, in order of their addition.
+        """
+
+        return list(self.subplanes)
+
+    def __getattr__(self, name):
+        """Access subplanes as attributes.
+
+           This is kept for compatibility, use Plane.subplanes[name] instead.
+           Raises AttributeError if there is no subplane of that name.
+        """
+
+        # The Python interpreter has already checked instance and class
+        # attributes, including unset slots. Do not look up special names or
+        # Plane.subplanes itself here, which would recurse if it is not set yet,
+        # e.g. in copy.copy() before __init__().
+        #
+        if name.startswith("__") or name == "subplanes":
+
+            raise AttributeError(name)
+
+        plane = self.subplanes.get(name)
+
+        if plane is None:
+
+            raise AttributeError(name)
+
+        return plane
+
+    def render(self, displayrect = None):
+        """Draw a composite surface of this plane and all subplanes, in order of their addition.
+
+           displayrect is the Rect of the Display, displaced relatively to this
+           Plane's Rect, so collision of subplanes can be tested using
+           Rect.colliderect(displayrect).
+
+           Returns True if anything has been rendered (i.e. when
+           Plane.rendersurface has changed), False otherwise. The areas that
+           changed are stored in Plane.dirty_rects.
+
+           This method will highlight subplanes that have the Plane.mousover
+           flag set.
+        """
+
+        # We only need to render if self.rendersurface does not point
+        # to self.image.
+        #
+        if self.rendersurface is self.image and id(self.image) == self.last_image_id:
+
+            STATS.unchanged_planes += 1
+
+            STATS.total_pixels += self.rect.width * self.rect.height
+
+            self.dirty_rects = []
+
+            return False
+
+        # Still here? Then it does not. But is this correct? Maybe the user has
+        # updated the image, but when there are no subplanes, there is no need
+        # to render.
+        #
+        if not self.subplanes:
+
+            # Fix the pointer
+            #
+            self.rendersurface = self.image
+
+            # Fix cached id
+            #
+            self.last_image_id = id(self.image)
+
+            STATS.total_pixels += self.rect.width * self.rect.height
+
+            self.dirty_rects = [self.rendersurface.get_rect()]
+
+            return True
+
+        # At this point, we know that rendersurface differs from image and that
+        # there are subplanes.
+
+        STATS.total_pixels += self.rect.width * self.rect.height * 2
+
+        # Collect the areas to redraw, relative to this Plane: where a subplane
+        # has been drawn before and where it is now if it has moved, or the
+        # dirty areas of the subplane if it has only been rendered. Areas of
+        # removed subplanes have already been collected by remove().
+        #
+        # TODO: This doesn't catch draw and blit operations outside render()!
+        #
+        damage = self._damage
+
+        self._damage = []
+
+        self._render_count += 1
+
+        if displayrect is None:
+
+            # That means we are the Display and are just starting the rendering
+            # cascade.
+            #
+            displayrect = self.rect
+
+        for plane in self.subplanes.values():
+
+            # Follow moved subplanes in the index
+            #
+            if self.spatial_index is not None:
+
+                self.spatial_index.update(plane.name, plane.rect)
+
+            # Only render if actually intersecting with Display
+            # TODO: bookkeeping: count rendered Planes
+            #
+            if plane.rect.colliderect(displayrect):
+
+                displayrect_to_pass = displayrect.move(- plane.rect.left,
+                                                       - plane.rect.top)
+
+                rendered = plane.render(displayrect_to_pass)
+
+                # A changed Plane needs a new highlight overlay
+                #
+                if rendered or plane.last_rect is None:
+
+                    plane._highlight_overlay = None
+
+                moved = plane.rect != plane.last_rect or plane.rect != plane.drawn_rect
+
+                if (rendered or moved) and self._layers is not None:
+
+                    plane._changed_at = self._render_count
+
+                    if self._layout is not None:
+
+                        if id(plane) not in self._layout[2]:
+
+                            self._layout = None
+
+                        elif plane.static is None:
+
+                            self._promote_at = min(self._promote_at,
+                                                   self._render_count + self._static_after + 1)
+
+                if moved:
+
+                    if plane.rect != plane.drawn_rect:
+
+                        Plane.scene_generation += 1
+
+                    if plane.drawn_rect is not None:
+
+                        damage.append(plane.drawn_rect)
+
+                    damage.append(plane.rect)
+
+                    # We need copies!
+                    #
+                    plane.last_rect = pygame.Rect(plane.rect)
+
+                    plane.drawn_rect = pygame.Rect(plane.rect)
+
+                elif rendered:
+
+                    damage.extend(rect.move(plane.rect.topleft) for rect in plane.dirty_rects)
+
+            else:
+
+                STATS.render_skip += 1
+
+                # A subplane that left the Display must still be erased
+                #
+                if plane.drawn_rect is not None:
+
+                    damage.append(plane.drawn_rect)
+
+                    plane.drawn_rect = None
+
+                    self._layout = None
+
+                    Plane.scene_generation += 1
+
+        full_redraw = (id(self.image) != self.last_image_id
+                       or self.rendersurface is None
+                       or self.rendersurface is self.image)
+
+        if not (full_redraw or damage):
+
+            STATS.unchanged_planes += 1
+
+            self.dirty_rects = []
+
+            return False
+
+        # Without layers, the composite starts from Plane.image and all
+        # subplanes are blitted on top.
+        #
+        base, layers = self.image, None
+
+        if self._layers is not None:
+
+            base, layers = self.composite_layers(displayrect)
+
+        if full_redraw or not _can_redraw_partially(self.image):
+
+            # Instead of clearing an existing Surface, we copy Plane.image. This
+            # is a little slower but has the huge benefit of creating an RGBA
+            # Surface with per pixel alpha when needed.
+            #
+            self.rendersurface = base.copy()
+
+            self.dirty_rects = [self.rendersurface.get_rect()]
+
+            # Subplanes are already rendered. Force-blit them in order.
+            #
+            self.composite(self.rendersurface, displayrect, layers)
+
+        else:
+
+            # Only restore the damaged areas from Plane.image and blit the
+            # subplanes there, clipped to each area.
+            #
+            self.dirty_rects = _merge_rects(damage, self.rendersurface.get_rect())
+
+            self.composite(self.rendersurface, displayrect, layers, base, self.dirty_rects)
+
+        self.last_image_id = id(self.image)
+
+        return True
+
+    def composite(self, surface, displayrect, layers, base = None, rects = None):
+        """Blit the subplanes intersecting displayrect, or the layers given, to surface.
+
+           layers is None or the list returned by composite_layers(). If rects
+           is given, only those areas are redrawn, each restored from the
+           Surface base first and clipped to. Else surface is expected to
+           hold the base already.
+        """
+
+        if rects is None:
+
+            if layers is None:
+
+                self.blit_subplanes(surface, displayrect)
+
+            else:
+                self.blit_layers(surface, layers)
+
+            return
+
+        for rect in rects:
+
+            surface.set_clip(rect)
+
+            surface.blit(base, rect, rect)
+
+            if layers is None:
+
+                self.blit_subplanes(surface, displayrect, rect)
+
+            else:
+                self.blit_layers(surface, layers, rect)
+
+        surface.set_clip(None)
+
+        return
+
+    def use_layers(self, static_after = 120):
+        """Composite the subplanes of this Plane in static and dynamic layers.
+
+           Each run of consecutive static subplanes is flattened into a cached
+           layer Surface, so redrawing an area costs one blit per run instead
+           of one per subplane. A run at the bottom is flattened onto
+           Plane.image, the others into SRCALPHA Surfaces, see flatten().
+           Dynamic subplanes are blitted one by one, as usual. A layer is
+           rebuilt when its subplanes change.
+
+           A subplane is static if its Plane.static is True. If it is None,
+           the subplane is static when it has not changed in the last
+           static_after calls to render(). Highlighted subplanes and those
+           with surface alpha or a colorkey are always dynamic. A new value
+           of Plane.static takes effect when the subplanes next change.
+        """
+
+        self._layers = {}
+
+        self._static_after = static_after
+
+        return
+
+    def composite_layers(self, displayrect):
+        """Sort the subplanes intersecting displayrect into layers, building or reusing the layer Surfaces.
+
+           Returns a tuple (base, layers). base is the Surface to start the
+           composite from: Plane.image, or a copy with the bottom static
+           layer flattened onto it. layers is a list of the dynamic subplanes
+           and the layers returned by flatten() above base, in order.
+        """
+
+        layout = self._layout
+
+        if (layout is not None
+            and layout[0] == id(self.image)
+            and layout[1] == displayrect):
+
+            if self._render_count >= self._promote_at:
+
+                # A dynamic subplane may be due to turn static. Those that
+                # changed meanwhile are not, so look again.
+                #
+                self._promote_at = min([plane._changed_at + self._static_after + 1
+                                        for plane in layout[2].values()
+                                        if plane.static is None
+                                            and not plane.mouseover
+                                            and _can_flatten(plane.rendersurface)]
+                                       or [self._render_count + self._static_after + 1])
+
+            if self._render_count < self._promote_at:
+
+                return (layout[3], layout[4])
+
+        runs = []
+
+        dynamic = {}
+
+        # Far enough to not trigger before the next change
+        #
+        self._promote_at = self._render_count + self._static_after + 1
+
+        run = None
+
+        for plane in self.subplanes.values():
+
+            if not plane.rect.colliderect(displayrect):
+
+                STATS.blit_skip += 1
+
+                continue
+
+            static = plane.static
+
+            if static is None:
+
+                promote_at = plane._changed_at + self._static_after + 1
+
+                static = self._render_count >= promote_at
+
+                if not static:
+
+                    self._promote_at = min(self._promote_at, promote_at)
+
+            if static and not plane.mouseover and _can_flatten(plane.rendersurface):
+
+                if run is None:
+
+                    run = []
+
+                    runs.append(run)
+
+                run.append(plane)
+
+            else:
+                run = None
+
+                runs.append(plane)
+
+                dynamic[id(plane)] = plane
+
+        base = self.image
+
+        layers = []
+
+        cache = {}
+
+        for item in runs:
+
+            if not isinstance(item, list):
+
+                layers.append(item)
+
+                continue
+
+            # Any change of a member changes its _changed_at, and so the key
+            #
+            key = tuple((id(plane), plane._changed_at) for plane in item)
+
+            bottom = item is runs[0]
+
+            if bottom:
+
+                key = (id(self.image),) + key
+
+            layer = self._layers.get(key)
+
+            if layer is None:
+
+                if bottom:
+
+                    layer = self.image.copy()
+
+                    for plane in item:
+
+                        layer.blit(plane.rendersurface, plane.rect)
+
+                else:
+                    layer = self.flatten(item)
+
+            cache[key] = layer
+
+            if bottom:
+
+                base = layer
+
+            else:
+                layers.append(layer)
+
+        # Layers not used any more are dropped
+        #
+        self._layers = cache
+
+        self._layout = (id(self.image), pygame.Rect(displayrect), dynamic, base, layers)
+
+        return (base, layers)
+
+    def flatten(self, planes):
+        """Return a layer for the list of static subplanes given, as a tuple (surface, rect, special_flags).
+
+           The layer Surface covers the union of the subplanes' Rects. If the
+           subplanes do not overlap each other, their pixels are copied as
+           they are, and the layer is blitted like a subplane, which gives
+           exactly the same result. Otherwise the layer holds premultiplied
+           colors and is blitted with BLEND_PREMULTIPLIED, which may be off by
+           one due to rounding.
+        """
+
+        rect = planes[0].rect.unionall([plane.rect for plane in planes])
+
+        surface = pygame.Surface(rect.size, flags = pygame.SRCALPHA)
+
+        rects = []
+
+        for plane in planes:
+
+            if plane.rect.collidelist(rects) != -1:
+
+                break
 
-            name = plane_identifier.name
+            rects.append(plane.rect)
 
         else:
-            name = plane_identifier
+            # On a transparent Surface, the maximum is a plain copy
+            #
+            for plane in planes:
 
-        if name in self.subplanes_list:
-            self.subplanes[name].parent = None
-            del self.subplanes[name]
-            del self.subplanes_list[self.subplanes_list.index(name)]
+                surface.blit(plane.rendersurface,
+                             plane.rect.move(- rect.left, - rect.top),
+                             special_flags = pygame.BLEND_RGBA_MAX)
 
-        # If there are still subplanes, then trigger a redraw of all of them
-        # by setting their last_rect to None.
-        #
-        for plane in self.subplanes.values():
+            return (surface, rect, 0)
 
-            plane.last_rect = None
+        for plane in planes:
 
-        return
+            if plane.rendersurface.get_flags() & pygame.SRCALPHA:
 
-    def remove_all(self):
-        """Convenience method to call Plane.remove() for all subplanes.
+                surface.blit(_premultiplied(plane.rendersurface),
+                             plane.rect.move(- rect.left, - rect.top),
+                             special_flags = pygame.BLEND_PREMULTIPLIED)
+
+            else:
+                surface.blit(plane.rendersurface,
+                             plane.rect.move(- rect.left, - rect.top))
+
+        return (surface, rect, pygame.BLEND_PREMULTIPLIED)
+
+    def blit_layers(self, surface, layers, cliprect = None):
+        """Blit the dynamic subplanes and layers returned by composite_layers() to surface, in order.
+
+           If cliprect is given, items outside of it are skipped. The clipping
+           area of surface must be set accordingly.
         """
 
-        # Make a copy since subplanes_list will be changed by remove()
-        #
-        for name in list(self.subplanes_list):
+        for layer in layers:
 
-            self.remove(name)
+            if isinstance(layer, Plane):
 
-        # We do not need to worry about rendering here: once all subplanes
-        # are gone, render() will point the rendersurface to image and
-        # redraw.
+                if cliprect is None or layer.rect.colliderect(cliprect):
 
-        return
+                    surface.blit(layer.rendersurface, layer.rect)
 
-    def __getattr__(self, name):
-        """Access subplanes as attributes.
-        """
+                    if layer.mouseover:
 
-        # The Python interpreter has already checked instance and class
-        # attributes. If this fails, an appropriate KeyError will be raised.
-        #
-        return self.subplanes[name]
+                        surface.blit(layer.highlight_overlay(),
+                                     layer.rect,
+                                     special_flags = pygame.BLEND_ADD)
 
-    def render(self, displayrect = None):
-        """Draw a composite surface of this plane and all subplanes, in order of their addition.
+            else:
+                layer_surface, rect, special_flags = layer
 
-           displayrect is the Rect of the Display, displaced relatively to this
-           Plane's Rect, so collision of subplanes can be tested using
-           Rect.colliderect(displayrect).
+                if cliprect is None or rect.colliderect(cliprect):
 
-           Returns True if anything has been rendered (i.e. when
-           Plane.rendersurface has changed), False otherwise.
+                    surface.blit(layer_surface, rect,
+                                 special_flags = special_flags)
 
-           This method will highlight subplanes that have the Plane.mousover
-           flag set.
-        """
+        return
 
-        # We only need to render if self.rendersurface does not point
-        # to self.image.
-        #
-        if self.rendersurface is self.image and id(self.image) == self.last_image_id:
+    def highlight_overlay(self):
+        """Return a Surface to be added to Plane.rendersurface with BLEND_ADD to highlight this Plane.
 
-            STATS.unchanged_planes += 1
+           The overlay is computed once and cached until Plane.rendersurface
+           changes. render() of the parent Plane drops the cache when this
+           Plane has been rendered or its last_rect has been reset.
+        """
 
-            STATS.total_pixels += self.rect.width * self.rect.height
+        if (self._highlight_overlay is not None
+            and self._highlight_source == id(self.rendersurface)):
 
-            return False
+            return self._highlight_overlay
 
-        # Still here? Then it does not. But is this correct? Maybe the user has
-        # updated the image, but when there are no subplanes, there is no need
-        # to render.
+        overlay = self.rendersurface.copy()
+
+        # Only premultiply Surfaces with the SRCALPHA flag, will
+        # raise an exception otherwise.
         #
-        if not self.subplanes:
+        if overlay.get_flags() & 0x00010000:
 
-            # Fix the pointer
+            # Premultiply alpha channel to RGB. Otherwise
+            # invisible RGB values will be added by BLEND_ADD.
+            # Technique suggested by Rene Dudfield
+            # <renesd@gmail.com> on pygame-users@seul.org
+            # on 19 Dec 2011
             #
-            self.rendersurface = self.image
+            overlay = pygame.image.fromstring(pygame.image.tostring(overlay,
+                                                                    "RGBA_PREMULT"),
+                                              overlay.get_size(),
+                                              "RGBA")
 
-            # Fix cached id
-            #
-            self.last_image_id = id(self.image)
+        overlay.blit(overlay, (0, 0), special_flags = pygame.BLEND_MULT)
+        overlay.blit(overlay, (0, 0), special_flags = pygame.BLEND_MULT)
 
-            STATS.total_pixels += self.rect.width * self.rect.height
+        # BLEND_ADD ignores alpha, so the overlay can be converted to the
+        # display format without it, which makes blitting it much faster.
+        #
+        if pygame.display.get_surface() is not None:
 
-            return True
+            overlay = overlay.convert()
 
-        # At this point, we know that rendersurface differs from image and that
-        # there are subplanes.
+        self._highlight_overlay = overlay
 
-        STATS.total_pixels += self.rect.width * self.rect.height * 2
+        self._highlight_source = id(self.rendersurface)
 
-        # If the image of this plane or any subplane has changed or if a
-        # subplane has moved: redraw everything.
-        #
-        # (The alternative would be to check for rect collisions to see where
-        # the background can be restored by using image, or caching inbetween
-        # rendering steps).
-        #
-        # TODO: This doesn't catch draw and blit operations outside render()!
-        #
-        subplane_changed = False
+        return overlay
 
-        if displayrect is None:
+    def blit_subplanes(self, surface, displayrect, cliprect = None):
+        """Blit the rendersurfaces of all subplanes intersecting displayrect to surface, in order.
 
-            # That means we are the Display and are just starting the rendering
-            # cascade.
-            #
-            displayrect = self.rect
+           If cliprect is given, only subplanes intersecting it are blitted.
+           Obeys the mouseover flag of the subplanes.
+        """
 
-        for plane in (self.subplanes[name] for name in self.subplanes_list):
+        for subplane in self.subplanes.values():
 
-            # Only render if actually intersecting with Display
-            # TODO: bookkeeping: count rendered Planes
+            # Again, only blit if actually intersecting with Display
+            # TODO: bookkeeping: count rendered and not rendered Planes
             #
-            if plane.rect.colliderect(displayrect):
+            if not subplane.rect.colliderect(displayrect):
 
-                displayrect_to_pass = displayrect.move(- plane.rect.left,
-                                                       - plane.rect.top)
+                STATS.blit_skip += 1
 
-                if plane.render(displayrect_to_pass):
+            elif cliprect is None or subplane.rect.colliderect(cliprect):
 
-                    subplane_changed = True
+                # First blit ordinary rendersurface
+                #
+                surface.blit(subplane.rendersurface, subplane.rect)
 
-                elif plane.rect != plane.last_rect:
+                # Add a highlight on top if mouseover is set
+                #
+                if subplane.mouseover:
 
-                    subplane_changed = True
+                    overlay = subplane.highlight_overlay()
 
-                    # We need a copy!
-                    #
-                    plane.last_rect = pygame.Rect(plane.rect)
+                    surface.blit(overlay,
+                                 subplane.rect,
+                                 special_flags = pygame.BLEND_ADD)
 
-            else:
+        return
 
-                STATS.render_skip += 1
+    def get_plane_at(self, coordinates):
+        """Return the (sub)plane and the succeeding parent coordinates at the given coordinates.
+           Subplanes are tested in reverse order of their addition (i.e. latest first).
+        """
 
-        if id(self.image) != self.last_image_id or subplane_changed:
+        plane = None
 
-            # Instead of clearing an existing Surface, we copy Plane.image. This
-            # is a little slower but has the huge benefit of creating an RGBA
-            # Surface with per pixel alpha when needed.
-            #
-            self.rendersurface = self.image.copy()
+        if self.spatial_index is not None:
 
-            # Subplanes are already rendered. Force-blit them in order.
-            # Obey mouseover flag.
-            #
-            surface = None
+            if self._subplane_order is None:
 
-            for subplane in (self.subplanes[name] for name in self.subplanes_list):
+                self._subplane_order = dict((name, position) for position, name in enumerate(self.subplanes))
 
-                # Again, only blit if actually intersecting with Display
-                # TODO: bookkeeping: count rendered and not rendered Planes
-                #
-                if subplane.rect.colliderect(displayrect):
+            # The topmost of the indexed candidates that really is there
+            #
+            names = [name for name in self.spatial_index.names_at(coordinates)
+                     if self.subplanes[name].rect.collidepoint(coordinates)]
 
-                    # First blit ordinary rendersurface
-                    #
-                    self.rendersurface.blit(subplane.rendersurface,
-                                            subplane.rect)
+            if names:
 
-                    # Add a highlight on top if mouseover is set
-                    #
-                    if subplane.mouseover:
+                plane = self.subplanes[max(names, key = self._subplane_order.__getitem__)]
 
-                        overlay = subplane.rendersurface.copy()
+        else:
 
-                        # Only premultiply Surfaces with the SRCALPHA flag, will
-                        # raise an exception otherwise.
-                        #
-                        if overlay.get_flags() & 0x00010000:
-
-                            # Premultiply alpha channel to RGB. Otherwise
-                            # invisible RGB values will be added by BLEND_ADD.
-                            # Technique suggested by Rene Dudfield
-                            # <renesd@gmail.com> on pygame-users@seul.org
-                            # on 19 Dec 2011
-                            #
-                            overlay = pygame.image.fromstring(pygame.image.tostring(overlay,
-                                                                                    "RGBA_PREMULT"),
-                                                              overlay.get_size(),
-                                                              "RGBA")
-
-                        overlay.blit(overlay, (0, 0), special_flags = pygame.BLEND_MULT)
-                        overlay.blit(overlay, (0, 0), special_flags = pygame.BLEND_MULT)
-
-                        self.rendersurface.blit(overlay,
-                                                subplane.rect,
-                                                special_flags = pygame.BLEND_ADD)
+            for subplane in reversed(self.subplanes.values()):
 
-                else:
+                if subplane.rect.collidepoint(coordinates):
 
-                    STATS.blit_skip += 1
+                    plane = subplane
 
-            self.last_image_id = id(self.image)
+                    break
 
-            return True
+        if plane is None:
 
-        else:
+            # It's me.
+            #
+            return (self, coordinates)
 
-            STATS.unchanged_planes += 1
+        return plane.get_plane_at((coordinates[0] - plane.rect.left, coordinates[1] - plane.rect.top))
 
-            return False
+    def use_spatial_index(self, cell_size = 64):
+        """Look up subplanes in Plane.get_plane_at() through a SpatialIndex instead of testing all of them.
 
-    def get_plane_at(self, coordinates):
-        """Return the (sub)plane and the succeeding parent coordinates at the given coordinates.
-           Subplanes are tested in reverse order of their addition (i.e. latest first).
+           This pays off for Planes with many subplanes. The index is kept up
+           to date in sub() and remove(), and follows moved subplanes in
+           render(). Call Plane.spatial_index.update(name, rect) after moving
+           a subplane when hit-testing it before the next rendering.
         """
 
-        # It's probaly me.
-        #
-        return_plane = self
-        return_coordinates = coordinates
-
-        for name in self.subplanes_list:
-
-            plane = self.subplanes[name]
+        self.spatial_index = SpatialIndex(cell_size)
 
-            if plane.rect.collidepoint(coordinates):
+        self._subplane_order = None
 
-                return_coordinates = (coordinates[0] - plane.rect.left, coordinates[1] - plane.rect.top)
+        for name, plane in self.subplanes.items():
 
-                return_plane, return_coordinates = plane.get_plane_at(return_coordinates)
+            self.spatial_index.update(name, plane.rect)
 
-        return (return_plane, return_coordinates)
+        return
 
     def update(self):
         """Update hook.
@@ -552,7 +1582,7 @@ class Plane:
 
             plane.rect.center = coordinates
 
-            if plane.name not in self.subplanes_list:
+            if plane.name not in self.subplanes:
 
                 plane.parent.remove(plane.name)
 
@@ -611,9 +1641,7 @@ class Plane:
 
             self.mouseover = True
 
-            # Set to None to trigger a rendering
-            #
-            self.last_rect = None
+            self.redraw_on_parent()
 
         return
 
@@ -626,9 +1654,32 @@ class Plane:
 
         self.mouseover = False
 
-        # Set to None to trigger a rendering
-        #
-        self.last_rect = None
+        self.redraw_on_parent()
+
+        return
+
+    def redraw_on_parent(self):
+        """Have the parent Plane redraw the area of this Plane in the next call to render().
+
+           Unlike resetting Plane.last_rect, this tells that the content of
+           this Plane did not change, so caches like the highlight overlay
+           stay valid.
+        """
+
+        if self.parent is not None and self.drawn_rect is not None:
+
+            self.parent._damage.append(self.drawn_rect)
+
+            # Highlighted Planes are never part of a static layer
+            #
+            self.parent._layout = None
+
+        else:
+
+            # Not drawn yet, or not by the current parent. Set to None to
+            # trigger a rendering.
+            #
+            self.last_rect = None
 
         return
 
@@ -659,6 +1710,167 @@ class Plane:
                                self.dropped_upon_callback,
                                self.sync_master_plane)
 
+class RenderList:
+    """A RenderList records blit() and set_clip() calls to a Surface, to be carried out later.
+
+       It stands in for the Surface in Plane.composite(), so a composite can
+       be prepared on one thread and drawn on another, see RenderThread.
+       Rects are copied, as the Planes may move before the calls are carried
+       out. The Surfaces blitted from must not be drawn on until then.
+
+       Attributes:
+
+       RenderList.surface
+           The Surface to draw on.
+
+       RenderList.operations
+           The list of recorded calls, as tuples (method, args, kwargs). It
+           may be shared by several RenderLists, to record the calls to
+           several Surfaces in order.
+    """
+
+    def __init__(self, surface, operations = None):
+        """Initialise.
+           If operations is not given, a new list is used.
+        """
+
+        self.surface = surface
+
+        if operations is None:
+
+            operations = []
+
+        self.operations = operations
+
+        return
+
+    def blit(self, source, dest, area = None, special_flags = 0):
+        """Record a call to Surface.blit().
+        """
+
+        if isinstance(dest, pygame.Rect):
+
+            dest = pygame.Rect(dest)
+
+        if area is not None:
+
+            area = pygame.Rect(area)
+
+        self.operations.append((self.surface.blit,
+                                (source, dest, area),
+                                {"special_flags": special_flags}))
+
+        return
+
+    def set_clip(self, rect):
+        """Record a call to Surface.set_clip().
+        """
+
+        if rect is not None:
+
+            rect = pygame.Rect(rect)
+
+        self.operations.append((self.surface.set_clip, (rect,), {}))
+
+        return
+
+class RenderThread(threading.Thread):
+    """A daemon thread carrying out the operations of RenderLists.
+
+       Pygame releases the global interpreter lock while blitting, so the
+       main thread can go on while the operations run.
+    """
+
+    def __init__(self):
+        """Initialise and start the thread.
+        """
+
+        threading.Thread.__init__(self, name = "planes render thread")
+
+        self.daemon = True
+
+        self._jobs = queue.Queue()
+
+        # Set while no job is pending
+        #
+        self._idle = threading.Event()
+
+        self._idle.set()
+
+        # An exception raised by the last job, to be raised again by wait()
+        #
+        self._error = None
+
+        self.start()
+
+        return
+
+    def submit(self, operations):
+        """Carry out the list of operations given, as recorded by RenderList, in the background.
+           Call wait() before submitting the next list.
+        """
+
+        self._idle.clear()
+
+        self._jobs.put(operations)
+
+        return
+
+    def wait(self):
+        """Block until the operations submitted last have been carried out.
+           Exceptions raised by the operations are raised here.
+        """
+
+        self._idle.wait()
+
+        if self._error is not None:
+
+            error = self._error
+
+            self._error = None
+
+            raise error
+
+        return
+
+    def stop(self):
+        """Finish the pending operations and end the thread.
+        """
+
+        self._jobs.put(None)
+
+        self.join()
+
+        return
+
+    def run(self):
+        """Thread main loop.
+        """
+
+        while True:
+
+            operations = self._jobs.get()
+
+            if operations is None:
+
+                return
+
+            starttime = time.perf_counter_ns()
+
+            try:
+
+                for method, args, kwargs in operations:
+
+                    method(*args, **kwargs)
+
+            except Exception as error:
+
+                self._error = error
+
+            STATS.log_render_thread_time((time.perf_counter_ns() - starttime) / 1e9)
+
+            self._idle.set()
+
 class Display(Plane):
     """planes main screen class.
        A Display instance serves as the root Plane in planes.
@@ -677,6 +1889,10 @@ class Display(Plane):
        Display.last_mouseover_plane
            The last Plane a mouseover condition was found for. Initially None.
 
+       Display.mouse_position
+           The last position of the mouse cursor, tracked from Pygame mouse
+           events. Initially None.
+
        Display.mouse_buttons
            A dict mapping Pygame mouse button numbers to description strings.
 
@@ -684,6 +1900,11 @@ class Display(Plane):
            Boolean flag to indicate whether to display performance statistics.
            Set in Display.process() by examining user input. Initially False.
 
+       Display.render_thread
+           The RenderThread compositing the frames, or None to composite
+           them in Display.render(). Initially None, see
+           Display.use_render_thread().
+
        Display.font
            A pygame.font.Font instance using the system default font.
     """
@@ -719,6 +1940,12 @@ class Display(Plane):
 
             self.display = pygame.display.set_mode(resolution_tuple, flags)
 
+        # Surfaces loaded before there was a display can be converted now
+        #
+        while _display_ready_callbacks:
+
+            _display_ready_callbacks.pop(0)()
+
         Plane.__init__(self, "display", pygame.Rect((0, 0), resolution_tuple))
 
         self.draggable = False
@@ -731,6 +1958,14 @@ class Display(Plane):
 
         self.last_mouseover_plane = None
 
+        self.mouse_position = None
+
+        # Cursor position and Plane.scene_generation at the last mouseover
+        # test. If neither changed, the test is skipped.
+        #
+        self._mouseover_position = None
+        self._mouseover_generation = None
+
         self.mouse_buttons = {1: "left",
                               3: "right",
                               4: "up",
@@ -744,15 +1979,71 @@ class Display(Plane):
         # Convenience Surface for statistics display.
         # See Display.render()
         #
-        self._stats_surface = pygame.Surface((320, 256))
+        self._stats_surface = pygame.Surface((320, 420))
 
-        self._stats_surface.convert()
+        # convert() returns a new Surface
+        #
+        self._stats_surface = self._stats_surface.convert()
 
-        # Make transparent. Currently has only a limited effect, since it might
-        # be blitted over itself in render().
+        # Make transparent
         #
         self._stats_surface.set_alpha(196, pygame.RLEACCEL)
 
+        # Whether the statistics have been shown in the last call to render()
+        #
+        self._stats_shown = False
+
+        # Rects of the Pygame display blitted to, but not yet returned by
+        # render(). A forced render() in process() adds to these.
+        #
+        self._updated_rects = []
+
+        self.render_thread = None
+
+        # The operations for the render thread, recorded in render()
+        #
+        self._operations = []
+
+        return
+
+    def use_render_thread(self):
+        """Composite frames on a RenderThread.
+
+           render() will then prepare the composite and the blits to the
+           Pygame display as a list of operations, hand them to the thread
+           and return, so the main thread can go on while they run. Call
+           wait_render() before updating the Pygame display. The Surfaces of
+           the Planes must not be drawn on until then; assigning new ones is
+           fine.
+        """
+
+        if self.render_thread is None:
+
+            self.render_thread = RenderThread()
+
+        return
+
+    def wait_render(self):
+        """Block until the RenderThread has drawn the frame prepared in the last call to render().
+           Returns at once if there is no RenderThread.
+        """
+
+        if self.render_thread is not None:
+
+            self.render_thread.wait()
+
+        return
+
+    def composite(self, surface, displayrect, layers, base = None, rects = None):
+        """Plane.composite(), recording the blits for the RenderThread if there is one.
+        """
+
+        if self.render_thread is not None:
+
+            surface = RenderList(surface, self._operations)
+
+        Plane.composite(self, surface, displayrect, layers, base, rects)
+
         return
 
     def key_sensitive(self, plane):
@@ -778,9 +2069,17 @@ class Display(Plane):
         """Process a pygame event list.
            This is the main method of planes and should be called once per
            frame.
-           It will also check mouseover conditions, even if event_list is empty.
+           It will also check mouseover conditions, even if event_list is empty,
+           unless neither the mouse cursor nor any Plane has moved since the
+           last check.
         """
 
+        # A frame starts here, see FrameProfiler
+        #
+        PROFILER.end_frame()
+
+        PROFILER.start("events")
+
         # We will only process mouseovers when nothing else has happened.
         # So we set up a flag here.
         #
@@ -788,6 +2087,12 @@ class Display(Plane):
 
         for event in event_list:
 
+            if event.type in (pygame.MOUSEMOTION,
+                              pygame.MOUSEBUTTONDOWN,
+                              pygame.MOUSEBUTTONUP):
+
+                self.mouse_position = event.pos
+
             if (event.type == pygame.MOUSEBUTTONDOWN
                 and event.button in self.mouse_buttons.keys()):
 
@@ -879,9 +2184,22 @@ class Display(Plane):
         #
         if nothing_happened:
 
+            self.process_mouseover()
+
+        PROFILER.stop("events")
+
+        return
+
+    def process_mouseover(self):
+        """Check the mouseover condition at the mouse position, calling Plane.mouseover_callback() and Plane.mouseout_callback() as needed.
+           Called by process().
+        """
+
+        if self.mouse_position is None:
+
             try:
 
-                mouseover_plane = self.get_plane_at(pygame.mouse.get_pos())[0]
+                self.mouse_position = pygame.mouse.get_pos()
 
             except pygame.error:
 
@@ -890,46 +2208,98 @@ class Display(Plane):
                 #
                 return
 
-            if id(mouseover_plane) == id(self.last_mouseover_plane):
+        # If the cursor did not move and no Plane did, the result would be
+        # the same as last time.
+        #
+        if (self.mouse_position == self._mouseover_position
+            and Plane.scene_generation == self._mouseover_generation):
 
-                # Still over it. No action.
-                #
-                pass
+            return
 
-            else:
+        self._mouseover_position = self.mouse_position
 
-                if self.last_mouseover_plane is not None:
+        self._mouseover_generation = Plane.scene_generation
 
-                    self.last_mouseover_plane.mouseout_callback()
+        mouseover_plane = self.get_plane_at(self.mouse_position)[0]
 
-                if id(mouseover_plane) == id(self):
+        if id(mouseover_plane) == id(self.last_mouseover_plane):
 
-                    # Ignore the Display
-                    #
-                    self.last_mouseover_plane = None
+            # Still over it. No action.
+            #
+            pass
 
-                else:
+        else:
+
+            if self.last_mouseover_plane is not None:
+
+                self.last_mouseover_plane.mouseout_callback()
+
+            if id(mouseover_plane) == id(self):
+
+                # Ignore the Display
+                #
+                self.last_mouseover_plane = None
 
-                    mouseover_plane.mouseover_callback()
+            else:
+
+                mouseover_plane.mouseover_callback()
 
-                    self.last_mouseover_plane = mouseover_plane
+                self.last_mouseover_plane = mouseover_plane
 
         return
 
     def render(self, force = False):
-        """Call base class render(), then blit to the Pygame display if something has changed.
-           If force is True, blit to Pygame display regardless.
+        """Call base class render(), then blit the areas that have changed to the Pygame display.
+           If force is True, blit the whole rendersurface regardless.
+
+           Returns a list of Rects of the Pygame display that have been blitted
+           to since the last call, suitable for pygame.display.update(). The
+           list is empty if nothing has changed.
         """
 
-        starttime = time.clock()
+        # The frame before must be complete before touching any Surface
+        #
+        self.wait_render()
+
+        PROFILER.start("render")
+
+        starttime = time.perf_counter_ns()
 
         rendered_something = Plane.render(self)
 
-        STATS.log_render_time(time.clock() - starttime)
+        STATS.log_render_time((time.perf_counter_ns() - starttime) / 1e9)
+
+        PROFILER.stop("render")
+
+        PROFILER.start("blit")
 
-        if rendered_something or force or self.dragged_plane is not None:
+        # Blits to the Pygame display are recorded for the render thread as
+        # well, in order after the composite.
+        #
+        display = self.display
+
+        if self.render_thread is not None:
+
+            display = RenderList(self.display, self._operations)
+
+        if force or self.dragged_plane is not None:
+
+            dirty_rects = [self.rendersurface.get_rect()]
+
+        elif rendered_something:
+
+            dirty_rects = self.dirty_rects
+
+        else:
+            dirty_rects = []
+
+        for rect in dirty_rects:
+
+            display.blit(self.rendersurface, rect, rect)
+
+        self._updated_rects.extend(dirty_rects)
 
-            self.display.blit(self.rendersurface, (0, 0))
+        if dirty_rects:
 
             if self.dragged_plane is not None:
 
@@ -942,8 +2312,8 @@ class Display(Plane):
                     #
                     self.dragged_plane.rect.center = pygame.mouse.get_pos()
 
-                    self.display.blit(self.dragged_plane.rendersurface,
-                                      self.dragged_plane.rect)
+                    display.blit(self.dragged_plane.rendersurface,
+                                 self.dragged_plane.rect)
 
                 else:
                     # Delete without dropping
@@ -1029,14 +2399,72 @@ class Display(Plane):
                                                       color,
                                                       background), (padding, y))
 
+            if self.render_thread is not None:
+
+                y += lineheight
+
+                self._stats_surface.blit(self.font.render("Render thread time: {:.1f} ms".format(STATS.render_thread_time * 1000),
+                                                          antialias,
+                                                          color,
+                                                          background), (padding, y))
+
+            y += lineheight
+
+            self._stats_surface.blit(self.font.render("Frame phases, p50 / p95 / p99:",
+                                                      antialias,
+                                                      color,
+                                                      background), (padding, y))
+
+            for phase in PROFILER.phases():
+
+                y += lineheight
+
+                self._stats_surface.blit(self.font.render("    {}: {:.2f} / {:.2f} / {:.2f} ms".format(phase, *[percentile * 1000 for percentile in PROFILER.percentiles(phase)]),
+                                                          antialias,
+                                                          color,
+                                                          background), (padding, y))
+
 
-            self.display.blit(self._stats_surface, (10, 10))
+            stats_rect = self._stats_surface.get_rect(topleft = (10, 10))
 
-            # Update and reset stats counter
+            # Restore the area below first, so the transparent overlay is not
+            # blitted over itself.
             #
-            STATS.update(self)
+            display.blit(self.rendersurface, stats_rect, stats_rect)
 
-        return
+            display.blit(self._stats_surface, stats_rect)
+
+            self._updated_rects.append(stats_rect)
+
+        elif self._stats_shown:
+
+            # Erase the overlay
+            #
+            stats_rect = self._stats_surface.get_rect(topleft = (10, 10))
+
+            display.blit(self.rendersurface, stats_rect, stats_rect)
+
+            self._updated_rects.append(stats_rect)
+
+        self._stats_shown = self.show_stats
+
+        # Update and reset stats counter
+        #
+        STATS.update(self)
+
+        if self._operations:
+
+            self.render_thread.submit(self._operations)
+
+            self._operations = []
+
+        PROFILER.stop("blit")
+
+        updated_rects = self._updated_rects
+
+        self._updated_rects = []
+
+        return updated_rects
 
 class Stats:
     """A Stats instance stores and computes several runtime statistics.
@@ -1070,6 +2498,19 @@ class Stats:
            Given Stats.mean_render_time, how many renders could be carried out
            in one second in theory. Note that this is not the actual FPS, which
            is largely determined by the application deploying the planes module.
+
+       Stats.render_thread_time
+           Time the RenderThread took for the last frame, if there is one.
+           Display.render() returns before this work is done, so it is not
+           part of Stats.render_time.
+
+       Stats.fps
+           Frames per second, from the time between the last two calls to
+           Stats.update().
+
+       Stats.sink
+           A MetricsSink to write a record of each frame to, or None.
+           Initially None.
     """
 
     # TODO: A Stats instance could be an iterator, yielding text Surfaces and rendering positions.
@@ -1096,12 +2537,34 @@ class Stats:
 
         self.renders_per_second = 0
 
+        self.render_thread_time = 0
+
+        self.fps = 0
+
+        self._last_update = None
+
+        self.sink = None
+
         return
 
     def update(self, display):
         """Actively update stats from the display instance given, and reset frame-to-frame counters.
+           Called by Display.render() once per frame. If there is a
+           Stats.sink, the counters are written to it before the reset.
         """
 
+        now = time.perf_counter_ns()
+
+        if self._last_update is not None and now > self._last_update:
+
+            self.fps = 1e9 / (now - self._last_update)
+
+        self._last_update = now
+
+        if self.sink is not None:
+
+            self.sink.write(self.record())
+
         self.total_planes = 0
 
         self.total_pixels = 0
@@ -1125,6 +2588,27 @@ class Stats:
 
         return
 
+    def record(self):
+        """Return a dict of the counters and times of the current frame, with the keys in MetricsSink.FIELDS except "frame" and "time".
+        """
+
+        return {"total_planes": self.total_planes,
+                "unchanged_planes": self.unchanged_planes,
+                "render_skip": self.render_skip,
+                "blit_skip": self.blit_skip,
+                "total_pixels": self.total_pixels,
+                "render_time": self.render_time,
+                "render_thread_time": self.render_thread_time,
+                "fps": self.fps}
+
+    def log_render_thread_time(self, render_thread_time):
+        """Set Stats.render_thread_time to the time given.
+        """
+
+        self.render_thread_time = render_thread_time
+
+        return
+
     def log_render_time(self, render_time):
         """Set Stats.render_time to the time given, and register that time for computing the mean.
         """
@@ -1141,7 +2625,350 @@ class Stats:
 
         return
 
+class FrameProfiler:
+    """A FrameProfiler measures the phases of each frame and keeps rolling percentiles of their durations.
+
+       A phase is timed between start() and stop() and may be run several
+       times per frame. Display.process() times the "events" phase,
+       Display.render() the "render" phase for rendering the Plane tree and
+       the "blit" phase for blitting to the Pygame display. The application
+       can time the others, e.g. "update" for the model and view and "flip"
+       for pygame.display.update(). A frame ends when end_frame() is called,
+       which Display.process() does first thing.
+
+       Durations are taken with time.perf_counter_ns() and reported in
+       seconds.
+
+       Attributes:
+
+       FrameProfiler.window
+           The number of frames the percentiles are computed from.
+
+       FrameProfiler.samples
+           A dict mapping phase names to a deque of the durations of the last
+           FrameProfiler.window frames in nanoseconds. The phase "frame" holds
+           the sum of all phases of each frame.
+    """
+
+    # The phases shown by Display in this order. Others are shown after these.
+    #
+    PHASES = ("events", "update", "render", "blit", "flip")
+
+    def __init__(self, window = 300):
+        """Initialise.
+        """
+
+        self.window = window
+
+        self.samples = {}
+
+        # Start times of running phases, and durations of the current frame
+        #
+        self._started = {}
+
+        self._frame = {}
+
+        return
+
+    def start(self, phase):
+        """Start timing the phase given.
+        """
+
+        self._started[phase] = time.perf_counter_ns()
+
+        return
+
+    def stop(self, phase):
+        """Stop timing the phase given, adding the time since start() to the current frame.
+        """
+
+        starttime = self._started.pop(phase, None)
+
+        if starttime is not None:
+
+            self._frame[phase] = self._frame.get(phase, 0) + time.perf_counter_ns() - starttime
+
+        return
+
+    def end_frame(self):
+        """Record the durations of the phases timed in the current frame, and start a new one.
+        """
+
+        if not self._frame:
+
+            return
+
+        self._frame["frame"] = sum(self._frame.values())
+
+        for phase, duration in self._frame.items():
+
+            if phase not in self.samples:
+
+                self.samples[phase] = collections.deque(maxlen = self.window)
+
+            self.samples[phase].append(duration)
+
+        self._frame = {}
+
+        return
+
+    def phases(self):
+        """Return a list of the names of the phases measured so far, in the order of FrameProfiler.PHASES, then by name, then "frame".
+        """
+
+        phases = [phase for phase in self.PHASES if phase in self.samples]
+
+        phases.extend(sorted(phase for phase in self.samples
+                             if phase not in self.PHASES and phase != "frame"))
+
+        if "frame" in self.samples:
+
+            phases.append("frame")
+
+        return phases
+
+    def percentiles(self, phase, percents = (50, 95, 99)):
+        """Return a tuple of the given percentiles of the durations of phase in seconds, using the nearest rank.
+           If the phase has not been measured, all are 0.
+        """
+
+        durations = sorted(self.samples.get(phase, ()))
+
+        if not durations:
+
+            return tuple(0.0 for percent in percents)
+
+        count = len(durations)
+
+        # Nearest rank: the smallest duration that percent of the frames do
+        # not exceed
+        #
+        return tuple(durations[max(0, - (- percent * count // 100) - 1)] / 1e9
+                     for percent in percents)
+
+    def reset(self):
+        """Discard all durations recorded.
+        """
+
+        self.samples = {}
+
+        self._started = {}
+
+        self._frame = {}
+
+        return
+
+class MetricsSink:
+    """A MetricsSink appends a record per frame to a file in JSON lines or CSV format, for analysis after the fact.
+
+       Assign it to Stats.sink to record the counters of planes.STATS each
+       frame. Records are collected in batches, and a daemon thread writes
+       each batch in one go, so write() does not touch the file. At most
+       max_batches batches wait to be written. When the thread falls behind
+       further, new batches are dropped and counted rather than blocking
+       the caller.
+
+       The sink is closed at interpreter exit, writing what is left.
+
+       Attributes:
+
+       MetricsSink.path
+           The path of the file.
+
+       MetricsSink.format
+           "jsonl" or "csv".
+
+       MetricsSink.frames
+           The number of records written with write().
+
+       MetricsSink.dropped
+           The number of records dropped because too many batches were
+           waiting.
+    """
+
+    # The keys of a record, and the columns of CSV files
+    #
+    FIELDS = ("frame",
+              "time",
+              "total_planes",
+              "unchanged_planes",
+              "render_skip",
+              "blit_skip",
+              "total_pixels",
+              "render_time",
+              "render_thread_time",
+              "fps")
+
+    def __init__(self, path, format = None, batch_size = 60, max_batches = 64, flush_interval = 1.0):
+        """Open the file at path for appending and start the writer thread.
+
+           format is "jsonl" or "csv". If None, it is "csv" for paths ending
+           in ".csv" and "jsonl" otherwise. A batch is handed to the writer
+           thread when it holds batch_size records, or flush_interval seconds
+           after the last one was.
+        """
+
+        self.path = path
+
+        if format is None:
+
+            format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+        if format not in ("jsonl", "csv"):
+
+            raise ValueError("format must be 'jsonl' or 'csv', not {0}".format(repr(format)))
+
+        self.format = format
+
+        self.batch_size = batch_size
+
+        self.flush_interval = flush_interval
+
+        self.frames = 0
+
+        self.dropped = 0
+
+        # newline = "" as the csv module writes its own line endings
+        #
+        self._file = open(path, "a", newline = "")
+
+        if self.format == "csv":
+
+            self._csv_writer = csv.DictWriter(self._file, self.FIELDS)
+
+            if self._file.tell() == 0:
+
+                self._csv_writer.writeheader()
+
+        self._batch = []
+
+        self._last_submit = time.monotonic()
+
+        self._batches = queue.Queue(maxsize = max_batches)
+
+        # An exception raised while writing, to be raised by close()
+        #
+        self._error = None
+
+        self._thread = threading.Thread(target = self._write_batches,
+                                        name = "planes metrics sink")
+
+        self._thread.daemon = True
+
+        self._thread.start()
+
+        atexit.register(self.close)
+
+        return
+
+    def write(self, record):
+        """Add the record dict given, with the keys in MetricsSink.FIELDS, to the current batch.
+           "frame" and "time" are filled in unless given.
+        """
+
+        if self._thread is None:
+
+            raise ValueError("write to closed MetricsSink")
+
+        full_record = {"frame": self.frames, "time": time.time()}
+
+        full_record.update(record)
+
+        self.frames += 1
+
+        self._batch.append(full_record)
+
+        if (len(self._batch) >= self.batch_size
+            or time.monotonic() - self._last_submit >= self.flush_interval):
+
+            self.submit()
+
+        return
+
+    def submit(self):
+        """Hand the current batch to the writer thread, or drop it if too many are waiting.
+        """
+
+        if self._batch:
+
+            try:
+                self._batches.put_nowait(self._batch)
+
+            except queue.Full:
+
+                self.dropped += len(self._batch)
+
+            self._batch = []
+
+        self._last_submit = time.monotonic()
+
+        return
+
+    def close(self):
+        """Write the pending records, end the writer thread and close the file.
+           Raises the first exception the writer thread ran into, if any.
+        """
+
+        if self._thread is None:
+
+            return
+
+        self.submit()
+
+        # Unlike batches, the end marker must not be dropped
+        #
+        self._batches.put(None)
+
+        self._thread.join()
+
+        self._thread = None
+
+        self._file.close()
+
+        atexit.unregister(self.close)
+
+        if self._error is not None:
+
+            raise self._error
+
+        return
+
+    def _write_batches(self):
+        """Writer thread main loop.
+        """
+
+        while True:
+
+            batch = self._batches.get()
+
+            if batch is None:
+
+                return
+
+            if self._error is not None:
+
+                # Writing failed before. Keep draining, so the queue does
+                # not fill up.
+                #
+                continue
+
+            try:
+                if self.format == "csv":
+
+                    self._csv_writer.writerows(batch)
+
+                else:
+                    self._file.write("".join(json.dumps(record) + "\n" for record in batch))
+
+                self._file.flush()
+
+            except Exception as error:
+
+                self._error = error
+
 # As there will only ever be one Display instance, we can keep a global Stats
 # instance and do not need to do it on a per-Display base.
 #
 STATS = Stats()
+
+PROFILER = FrameProfiler()
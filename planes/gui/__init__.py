@@ -12,6 +12,10 @@
 
    FONTS
        An instance of Fonts, a font manager.
+
+   TEXT_CACHE
+       An instance of TextCache, caching rendered text Surfaces for all
+       Labels.
 """
 
 # This file is part of planes.
@@ -36,6 +40,7 @@
 
 import planes
 import pygame
+import collections
 import os.path
 import sys
 import unicodedata
@@ -288,6 +293,102 @@ class Fonts:
 #
 FONTS = Fonts()
 
+class TextCache:
+    """A least recently used cache of rendered text Surfaces.
+
+       Labels rendering the same strings over and over again, like counters
+       and timers, get the Surface of an earlier rendering instead of
+       rasterising the text again. The Surfaces returned are shared and must
+       not be drawn upon.
+
+       Attributes:
+
+       TextCache.max_size
+           The maximum number of Surfaces to keep. When exceeded, the least
+           recently used Surface is dropped.
+
+       TextCache.hits
+           Number of renderings served from the cache.
+
+       TextCache.misses
+           Number of renderings that had to call pygame.font.Font.render().
+    """
+
+    def __init__(self, max_size = 512):
+        """Initialise.
+        """
+
+        self.max_size = max_size
+
+        self.hits = 0
+
+        self.misses = 0
+
+        self._surfaces = collections.OrderedDict()
+
+        return
+
+    def render(self, font, text, antialias, color, background = None):
+        """Return a Surface of text rendered like pygame.font.Font.render(), from the cache if possible.
+        """
+
+        # Colors may be given as lists, which are not hashable
+        #
+        if background is not None:
+
+            background = tuple(background)
+
+        key = (font, text, antialias, tuple(color), background)
+
+        surface = self._surfaces.get(key)
+
+        if surface is not None:
+
+            self.hits += 1
+
+            self._surfaces.move_to_end(key)
+
+            return surface
+
+        self.misses += 1
+
+        if background is None:
+
+            surface = font.render(text, antialias, color)
+
+        else:
+            surface = font.render(text, antialias, color, background)
+
+        self._surfaces[key] = surface
+
+        if len(self._surfaces) > self.max_size:
+
+            self._surfaces.popitem(last = False)
+
+        return surface
+
+    def clear(self):
+        """Drop all cached Surfaces and reset the counters.
+        """
+
+        self._surfaces.clear()
+
+        self.hits = 0
+
+        self.misses = 0
+
+        return
+
+    def __len__(self):
+        """Return the number of cached Surfaces.
+        """
+
+        return len(self._surfaces)
+
+# Create a singleton text cache, shared by all Labels.
+#
+TEXT_CACHE = TextCache()
+
 def draw_border(plane, color):
     """Draw a border around plane.
     """
@@ -392,7 +493,7 @@ class Label(planes.Plane):
 
             # Text is centered on rect.
             #
-            fontsurf = self.font.render(self.text, True, self.text_color)
+            fontsurf = TEXT_CACHE.render(self.font, self.text, True, self.text_color)
 
             centered_rect = fontsurf.get_rect()
 
@@ -467,9 +568,10 @@ class OutlinedText(Label):
 
             # Black outline
             #
-            font_surface = self.font.render(self.text,
-                                            True,
-                                            (0, 0, 0))
+            font_surface = TEXT_CACHE.render(self.font,
+                                             self.text,
+                                             True,
+                                             (0, 0, 0))
 
             target_surface = pygame.Surface(font_surface.get_rect().inflate(2, 2).size,
                                             flags = pygame.SRCALPHA)
@@ -487,9 +589,10 @@ class OutlinedText(Label):
 
             # Center
             #
-            font_surface = self.font.render(self.text,
-                                            True,
-                                            self.text_color)
+            font_surface = TEXT_CACHE.render(self.font,
+                                             self.text,
+                                             True,
+                                             self.text_color)
 
             target_surface.blit(font_surface, (1, 1))
 
@@ -1058,7 +1161,8 @@ class TextBox(Label):
             # Give background for speedup.
             # Clever use of a dict to avoid an 'if'! :-)
             #
-            fontsurf = FONTS.small_font.render(self.text + {True: "|", False: ""}[self.active],
+            fontsurf = TEXT_CACHE.render(FONTS.small_font,
+                                         self.text + {True: "|", False: ""}[self.active],
                                          True,
                                          (0, 0, 0),
                                          self.current_color)
@@ -1391,8 +1495,10 @@ class FadingContainer(Container):
             else:
                 self.rendersurface.set_alpha(self.alpha_steps.pop(0))
 
-        # Always return True to force a redraw
+        # Always return True to force a redraw, of the whole Plane
         #
+        self.dirty_rects = [self.rendersurface.get_rect()]
+
         return True
 
 class ProgressBar(planes.Plane):
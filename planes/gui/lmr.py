@@ -86,18 +86,33 @@ class LMRStyle:
            left_img, mid_img and right_img are the respective image file names.
         """
 
-        # TODO: convert_alpha() should be called as soon as a display is available.
-
         self.left_img = pygame.image.load(left_img)
 
         self.mid_img = pygame.image.load(mid_img)
 
         self.right_img = pygame.image.load(right_img)
 
+        # Styles are created on import, usually before there is a display
+        #
+        planes.when_display_ready(self.convert)
+
         self.text_color = text_color
 
         return
 
+    def convert(self):
+        """Convert the images to the pixel format of the display for faster blitting.
+           Called automatically as soon as a display exists.
+        """
+
+        self.left_img = planes.convert_surface(self.left_img)
+
+        self.mid_img = planes.convert_surface(self.mid_img)
+
+        self.right_img = planes.convert_surface(self.right_img)
+
+        return
+
 # Create some default styles
 #
 ORANGE_BUTTON_STYLE = LMRStyle(os.path.join(planes.gui.GFX_PATH,
@@ -264,9 +279,10 @@ class LMRButton(LMRWidget, planes.gui.Button):
 
             # Text is centered on rect.
             #
-            fontsurf = planes.gui.FONTS.small_font.render(self.text,
-                                                        True,
-                                                        self.style.text_color)
+            fontsurf = planes.gui.TEXT_CACHE.render(planes.gui.FONTS.small_font,
+                                                    self.text,
+                                                    True,
+                                                    self.style.text_color)
 
             centered_rect = fontsurf.get_rect()
 
@@ -333,9 +349,10 @@ class LMROption(LMRWidget, planes.gui.Option):
 
         # Text is centered on rect.
         #
-        fontsurf = planes.gui.FONTS.small_font.render(self.text,
-                                                    True,
-                                                    self.style.text_color)
+        fontsurf = planes.gui.TEXT_CACHE.render(planes.gui.FONTS.small_font,
+                                                self.text,
+                                                True,
+                                                self.style.text_color)
 
         centered_rect = fontsurf.get_rect()
 
@@ -77,14 +77,29 @@ class TMBStyle:
            top_img, mid_img and bottom_img are the respective image file names.
         """
 
-        # TODO: convert_alpha() should be called as soon as a display is available.
-
         self.top_img = pygame.image.load(top_img)
 
         self.mid_img = pygame.image.load(mid_img)
 
         self.bottom_img = pygame.image.load(bottom_img)
 
+        # Styles are created on import, usually before there is a display
+        #
+        planes.when_display_ready(self.convert)
+
+        return
+
+    def convert(self):
+        """Convert the images to the pixel format of the display for faster blitting.
+           Called automatically as soon as a display exists.
+        """
+
+        self.top_img = planes.convert_surface(self.top_img)
+
+        self.mid_img = planes.convert_surface(self.mid_img)
+
+        self.bottom_img = planes.convert_surface(self.bottom_img)
+
         return
 
 # Create some default styles
@@ -0,0 +1,83 @@
+# Anne LoVerso
+# Python Set Game - frame scheduler
+
+'''
+Paces the main loop
+While something changes on screen, frames run at a target rate, paced by a
+pygame.time.Clock, which sleeps between frames instead of spinning.
+Once a frame changes nothing and nothing is animating, the scheduler goes
+idle and blocks in pygame.event.wait until an event arrives or idle_timeout
+milliseconds pass, so an idle game uses next to no CPU but clocks on screen
+still tick.
+Animations that move only every few frames must keep the scheduler busy in
+between, or their frames would be stretched by the idle wait.
+Achieved frames per second and CPU time per frame are measured over windows
+of about a second.
+'''
+
+import time
+
+import pygame
+
+FPS = 60
+IDLE_TIMEOUT = 100 # ms, the longest an idle frame waits for an event
+
+class FrameScheduler:
+	def __init__ (self, fps=FPS, idle_timeout=IDLE_TIMEOUT):
+		self.fps = fps
+		self.idle_timeout = idle_timeout
+		self.clock = pygame.time.Clock ()
+		self.idle = False
+		self.frame_time = 0 # ms the last frame took, not counting an idle wait
+
+		# results of the last finished measuring window
+		self.achieved_fps = 0.0
+		self.cpu_per_frame = 0.0 # seconds
+		self.idle_frames = 0 # of the last window
+
+		self._frames = 0
+		self._idle_frames = 0
+		self._window_start = time.perf_counter ()
+		self._cpu_start = time.process_time ()
+
+	# Returns the events of this frame
+	# When idle, blocks until there is an event or idle_timeout passes
+	def get_events (self):
+		if not self.idle:
+			return pygame.event.get ()
+		event = pygame.event.wait (self.idle_timeout)
+		# keep the clock from counting the idle wait as frame time
+		self.clock.tick ()
+		if event.type == pygame.NOEVENT:
+			return []
+		return [event] + pygame.event.get ()
+
+	# Ends a frame, changed tells whether it drew anything or is animating
+	# Sleeps until the next frame is due, unless the scheduler turns idle
+	# Returns True when a new measuring window has finished
+	def end_frame (self, changed):
+		self.idle = not changed
+		if self.idle:
+			self._idle_frames += 1
+			self.frame_time = self.clock.tick ()
+		else:
+			self.frame_time = self.clock.tick (self.fps)
+
+		self._frames += 1
+		elapsed = time.perf_counter () - self._window_start
+		if elapsed < 1.0:
+			return False
+
+		cpu = time.process_time () - self._cpu_start
+		self.achieved_fps = self._frames / elapsed
+		self.cpu_per_frame = cpu / self._frames
+		self.idle_frames = self._idle_frames
+		self._frames = 0
+		self._idle_frames = 0
+		self._window_start = time.perf_counter ()
+		self._cpu_start = time.process_time ()
+		return True
+
+	def report (self):
+		return "{:.1f} fps, {:.2f} ms CPU / frame, {} idle frames".format (
+			self.achieved_fps, self.cpu_per_frame * 1000, self.idle_frames)
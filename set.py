@@ -1,6 +1,7 @@
 # Anne LoVerso
 # Python Set Game
 
+import argparse
 import pygame
 import math
 from pygame.locals import *
@@ -10,9 +11,15 @@ from abc import ABCMeta, abstractmethod
 import planes
 import planes.gui
 
+import assets
+import scheduler
 from class_utils import Button
 from class_utils import ScreenText
 
+from setgame import board
+from setgame import cards
+from setgame.state import GameState, NUM_HINTS
+
 ####################
 # DEFINE CONSTANTS #
 ####################
@@ -41,70 +48,68 @@ EASY = 4
 MEDIUM = 2
 HARD = 1
 
-NUM_HINTS = 100
 TIME_DEDUC = 3000
+# steps per second of the time box, it moves a pixel every speed steps
+# the pace it had at the default frame rate, when it took a step on both of its two updates a frame
+TIME_BOX_STEPS = 2 * scheduler.FPS
 
 FONT_BIG = pygame.font.SysFont ("Arial", 40)
 FONT_SMALL = pygame.font.SysFont ("Arial", 20)
 
-colors = ['green', 'red', 'purple']
-shapes = ['oval', 'diamond', 'squiggle']
-numbers = [1,2,3]
-shades = ['filled','shaded', 'empty']
+colors = cards.COLORS
+shapes = cards.SHAPES
+numbers = cards.NUMBERS
+shades = cards.SHADES
 
 '''
 Given three cards, checks whether they form a Set
+Uses the precomputed card codes, see setgame.cards
 Args: card1, card2, card3 - objects of type Card
 Returns: True if cards form a Set, False otherwise
 '''
 def check_set (card1, card2, card3):
-	color_check = all_same_or_all_diff (card1.color, card2.color, card3.color)
-	shape_check = all_same_or_all_diff (card1.shape, card2.shape, card3.shape)
-	num_check = all_same_or_all_diff (card1.number, card2.number, card3.number)
-	shade_check = all_same_or_all_diff (card1.shade, card2.shade, card3.shade)
-	return color_check and shape_check and num_check and shade_check
+	return cards.is_set (card1.code, card2.code, card3.code)
 
 '''
-Given three attributes (one from each of three cards), checks whether the
-they are either all the same, or all different
-Functions as a helper method to check_set
-Args: attr1, attr2, attr3 - attributes of a card (color, shape, number, shade)
-Returns: True if all three attributes are equal OR none of them are equal, False otherwise
+Given a list of cards, yields every Set among them exactly once, lazily
+Sets come in board order, see setgame.board.iter_sets
+Args: card_list - list of objects of type Card
+Returns: generator of tuples of three Cards
 '''
-def all_same_or_all_diff (attr1, attr2, attr3):
-	if attr1 == attr2 and attr2 == attr3:
-		return True
-	elif (attr1 != attr2) and (attr2 != attr3) and (attr3 != attr1):
-		return True
-	else:
-		return False
+def find_all_sets (card_list):
+	by_code = dict ((card.code, card) for card in card_list)
+	for found in board.iter_sets ([card.code for card in card_list]):
+		yield tuple (by_code[code] for code in found)
 
 '''
 Helper function, takes a game time in seconds and formats it into a human-readable string
 Returns string in format, for example: "1m 20s"
 '''
 def format_secs (secs):
-	minutes = secs / 60
-	seconds = secs % 60
+	# whole seconds, so the text only changes once a second
+	minutes = int (secs) // 60
+	seconds = int (secs) % 60
 	return str (minutes) + "m " + str (seconds) + "s"
 
 '''
 a Card has attributes of color, shape, number, and shade
+code is the card encoded as an int from 0 to 80, see setgame.cards
 '''
 class Card (planes.Plane):
+	# no instance dict, there are 81 cards in every game
+	__slots__ = ("color", "shape", "number", "shade", "code", "been_clicked")
+
 	def __init__ (self, name, color, shape, number, shade):
 		planes.Plane.__init__ (self, name, pygame.Rect (0,0,CARD_WIDTH,CARD_HEIGHT), False, False)
 		self.color = color
 		self.shape = shape
 		self.number = number
 		self.shade = shade
+		self.code = cards.encode (color, shape, number, shade)
 		self.been_clicked = False
 		
 	def __eq__ (self, other):
-		return  self.color == other.color and \
-				self.shape == other.shape and \
-				self.number == other.number and \
-				self.shade == other.shade
+		return self.code == other.code
 
 	def __ne__ (self, other):
 		return not self.__eq__(other)
@@ -124,12 +129,24 @@ class TimeBox (planes.Plane):
 		# time is time for box to move to bottom of screen in seconds
 		self.speed = speed
 		self.image.fill ((100,100,100))
-		self.counter = 1 # need this because it can't move by fractional pixels
+		self.steps = 0 # steps not moved yet, times 1000, need this because it can't move by fractional pixels
 
+	# Called by planes on every frame, the box is moved by advance instead
 	def update (self):
-		self.counter += 1
-		if self.speed != 0 and self.rect.y < 0 and (self.counter % self.speed) == 0:
-			self.rect.y += 1
+		pass
+
+	# Moves the box for frame_time milliseconds, so it takes as long to fill
+	# the screen at any frame rate
+	def advance (self, frame_time):
+		if self.is_moving ():
+			self.steps += frame_time * TIME_BOX_STEPS
+			pixels = self.steps // (self.speed * 1000)
+			self.steps -= pixels * self.speed * 1000
+			self.rect.y = min (0, self.rect.y + pixels)
+
+	# The box moves a pixel only every few steps, so it is moving even on the frames it stays put
+	def is_moving (self):
+		return self.speed != 0 and self.rect.y < 0
 
 ##################
 # BUTTON CLASSES #
@@ -140,12 +157,11 @@ class TimeBox (planes.Plane):
 class AddThreeCardsButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/plus3_icon.png")
+		self.image = assets.load_image ("img/plus3_icon.png")
 
 	def clicked (self, button_name):
 		if self.model.check_in_play():
-			if not self.model.check_if_any_sets:
-				self.model.add_new_cards (3)
+			self.model.state.add_three ()
 
 # GAME BUTTON
 ### When clicked, gives a hint
@@ -155,49 +171,40 @@ class AddThreeCardsButton (Button):
 class HintButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/hint_icon.png")
+		self.image = assets.load_image ("img/hint_icon.png")
 
 	def clicked (self, button_name):
 		if self.model.check_in_play():
-			if (self.model.hints_left > 0):
-				self.model.hints_left -= 1
-				for card1 in self.model.in_play_cards:
-						for card2 in self.model.in_play_cards:
-							for card3 in self.model.in_play_cards:
-								if card1 != card2 and card2 != card3 and card1 != card3:
-									if check_set (card1, card2, card3):
-										if not card1.been_clicked:
-											card1.been_clicked = True
-											return
-										elif not card2.been_clicked:
-											card2.been_clicked = True
-											return
-										else:
-											card3.been_clicked = True
-											return
-				self.model.add_new_cards (3)
+			found = self.model.state.hint () # adds three cards if there is no set
+			if found is not None:
+				card1, card2, card3 = [self.model.deck[code] for code in found]
+				if not card1.been_clicked:
+					card1.been_clicked = True
+				elif not card2.been_clicked:
+					card2.been_clicked = True
+				else:
+					card3.been_clicked = True
 
 # GAME BUTTON
 ### When clicked, pauses time in game
 class PauseButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/pause_icon.png")
+		self.image = assets.load_image ("img/pause_icon.png")
 
 	def clicked (self, button_name):
 		if not (self.model.check_if_lost() or self.model.check_if_won()):
-			if self.model.paused_time_at != 0: # game is already paused, act as play button
-				self.model.pause_time += pygame.time.get_ticks () - self.model.paused_time_at
-				self.model.paused_time_at = 0
+			if self.model.state.is_paused (): # game is already paused, act as play button
+				self.model.state.resume ()
 			else:
-				self.model.paused_time_at = pygame.time.get_ticks ()
+				self.model.state.pause ()
 
 # GAME BUTTON (pause screen)
 ### When clicked, return to Homescreen
 class BackButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/back_icon.png")
+		self.image = assets.load_image ("img/back_icon.png")
 
 	def clicked (self, button_name):
 		self.model.model.game = None
@@ -208,46 +215,45 @@ class BackButton (Button):
 class PlayButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/start_icon.png")
+		self.image = assets.load_image ("img/start_icon.png")
 
 	def clicked (self, button_name):
 		if self.model.check_if_won () or self.model.check_if_lost (): # if game over act as restart button
 			self.model.model.game = None
-			self.model.model.game = Game (self.model.model.game_select, self.model.model)
+			self.model.model.game = Game (self.model.model.game_select, self.model.model, self.model.model.seed)
 		else:
-			self.model.pause_time += pygame.time.get_ticks () - self.model.paused_time_at
-			self.model.paused_time_at = 0
+			self.model.state.resume ()
 
 # GAME BUTTON (pause screen)
 ### Restarts the game by creating a new Game object
 class RestartButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/restart_icon.png")
+		self.image = assets.load_image ("img/restart_icon.png")
 
 	def clicked (self, button_name):
 		self.model.model.game = None
-		self.model.model.game = Game (self.model.model.game_select, self.model.model)
+		self.model.model.game = Game (self.model.model.game_select, self.model.model, self.model.model.seed)
 
 # HOME BUTTON
 ### Starts a new game by creating a new Game object
 class StartButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/start_icon.png")
+		self.image = assets.load_image ("img/start_icon.png")
 		self.clickbox = False   # all home screen buttons have a clickbox option
 								# which shows up as blakc box to indicate selection
 
 	def clicked (self, button_name):
 		self.model.mode = MODE_GAME
-		self.model.game = Game (self.model.game_select, self.model)
+		self.model.game = Game (self.model.game_select, self.model, self.model.seed)
 
 # HOME BUTTON
 ### Sets game_select mode to no timer
 class NoTimeButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/notime_icon.png")
+		self.image = assets.load_image ("img/notime_icon.png")
 		self.clickbox = True
 
 	def clicked (self, button_name):
@@ -261,7 +267,7 @@ class NoTimeButton (Button):
 class EasyButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/easy_icon.png")
+		self.image = assets.load_image ("img/easy_icon.png")
 		self.clickbox = False
 
 	def clicked (self, button_name):
@@ -275,7 +281,7 @@ class EasyButton (Button):
 class MedButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/med_icon.png")
+		self.image = assets.load_image ("img/med_icon.png")
 		self.clickbox = False
 
 	def clicked (self, button_name):
@@ -289,7 +295,7 @@ class MedButton (Button):
 class HardButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/hard_icon.png")
+		self.image = assets.load_image ("img/hard_icon.png")
 		self.clickbox = False
 
 	def clicked (self, button_name):
@@ -304,7 +310,7 @@ class HardButton (Button):
 class StatsButton (Button):
 	def __init__(self, name, rect, callback, model):
 		Button.__init__ (self, name, rect, callback, model)
-		self.image = pygame.image.load ("img/stats_icon.png")
+		self.image = assets.load_image ("img/stats_icon.png")
 		self.clickbox = False
 
 	def clicked (self, button_name):
@@ -327,9 +333,9 @@ class StatsButton (Button):
 			message_texts = []
 			lines = win_stats.split ("\n")
 			box_width = 13*WINDOW_WIDTH/16
-			for line in lines:
+			for i, line in enumerate (lines):
 				message_texts.append (ScreenText (line, line, 
-									  pygame.Rect(left_margin, top_margin + 60*(lines.index(line)+1) ,box_width, 45), FONT_BIG))
+									  pygame.Rect(left_margin, top_margin + 60*(i+1) ,box_width, 45), FONT_BIG))
 
 			#message_text.background_color = (255,0,0) #fixthis not transparent
 			self.model.show_stats.append (message_box)
@@ -337,9 +343,12 @@ class StatsButton (Button):
   
 '''
 A Game is a single game that ends when won, lost or cancelled
+The rules live in a GameState (see setgame.state), the Game only draws them
+seed decides the order of the deck, a random one is picked if it is None
+The seed of a game is self.state.seed, playing with it again deals the same cards
 '''      
 class Game ():
-	def __init__(self, game_select, model):
+	def __init__(self, game_select, model, seed=None):
 		########################
 		# GAME SCREEN ELEMENTS #
 		########################
@@ -348,13 +357,12 @@ class Game ():
 		self.model = model
 		self.game_select = game_select
 
-		self.pause_time = 0
-		self.paused_time_at = 0
-
-		self.start_time = pygame.time.get_ticks ()
-		self.end_time = 0 # time game ended at
+		# deals the first 12 cards
+		self.state = GameState (pygame.time.get_ticks, seed, NUM_HINTS)
 
 		#make 81 unique cards, add to deck
+		#built in code order, so self.deck[card.code] is card
+		#card images are shared by all games, see assets.py
 		for color in colors:
 			for shape in shapes:
 				for number in numbers:
@@ -362,33 +370,31 @@ class Game ():
 						card_to_add = Card (color + shape + shade + str (number),
 											color, shape, number, shade)
 						self.deck.append (card_to_add)
-						card_to_add.image = pygame.image.load ("img/" + card_to_add.name + ".png")
+						card_to_add.image = assets.card_image (card_to_add.code)
 						
 		self.actors = []
 
-		self.in_play_cards = []
 		self.clicked_cards = []
-		self.out_of_play_cards = []
-
-		self.sets_found = 0
-		self.sets_wrong = 0 # should we take off points for these?
-		self.hints_left = NUM_HINTS
+		self.click_boxes = [] # pool of highlights for clicked cards, see get_click_box
 
 		# tells if we have already added the game time to the times []
 		# prevents from adding the time on every update loop
 		self.added_time = False
 
+		# end and pause screens, built once, see get_message
+		self.messages = {}
+
 		#### Elements of a game ####
 		self.sets_found_label = ScreenText ("sets_found_label", 
-											"Sets: " + str (self.sets_found), 
+											"Sets: " + str (self.state.sets_found), 
 											pygame.Rect (3*WINDOW_WIDTH/4, 290, WINDOW_WIDTH/4, 50), 
 											FONT_BIG)
 		self.time_label = ScreenText ("time_label", 
-									  "Time: " + format_secs (self.start_time / 1000),
+									  "Time: " + format_secs (self.state.start_time / 1000),
 									  pygame.Rect (3*WINDOW_WIDTH/4, 220, WINDOW_WIDTH/4, 100),
 									  FONT_BIG)
 		self.left_in_deck_label = ScreenText ("left_in_deck_label", 
-									  "Deck: " + str (len (self.deck) - (len (self.in_play_cards) + len (self.out_of_play_cards))),
+									  "Deck: " + str (self.state.cards_left ()),
 									  pygame.Rect (3*WINDOW_WIDTH/4, 505, WINDOW_WIDTH/4, 25), 
 									  FONT_SMALL)
 
@@ -405,13 +411,13 @@ class Game ():
 										PauseButton.clicked,
 										self)
 		self.hints_left_label = ScreenText ("hints_left_label", 
-											"Hints Remaining: " + str (self.hints_left), 
+											"Hints Remaining: " + str (self.state.hints_left), 
 											pygame.Rect (3*WINDOW_WIDTH/4, 475, WINDOW_WIDTH/4, 25), 
 											FONT_SMALL)
 		self.logo = planes.Plane ("setlogo",
 								  pygame.Rect (3*WINDOW_WIDTH/4, 50, 240, 162),
 								  False, False)
-		self.logo.image = pygame.image.load ("img/set.jpg")
+		self.logo.image = assets.load_image ("img/set.jpg")
 		self.time_box = TimeBox ("time_box", pygame.Rect (0, -WINDOW_HEIGHT, WINDOW_WIDTH, WINDOW_HEIGHT), game_select)
 
 
@@ -435,117 +441,150 @@ class Game ():
 		self.gamelabels = [self.sets_found_label, self.time_label, self.hints_left_label, self.left_in_deck_label]
 		self.pausebuttons = [self.play_button, self.restart_button, self.back_button]
 
-		# start the game
-		self.add_new_cards (12)
+	# Returns the i-th pooled click box, the highlight drawn around a clicked card
+	# Boxes are only created the first time they are needed and reused afterwards
+	def get_click_box (self, i):
+		while len (self.click_boxes) <= i:
+			clicked_box = planes.Plane ("clickbox" + str (len (self.click_boxes)),
+										pygame.Rect (0, 0, CARD_WIDTH + 10, CARD_HEIGHT + 10),
+										False, False)
+			clicked_box.image = assets.load_image ("img/clickbox.png")
+			self.click_boxes.append (clicked_box)
+		return self.click_boxes[i]
 
-	# Add cards to the in-play cards
-	# Number = number of cards to add
-	# Index allows adding 1 card in the same position as a removed card
-	# Does not check whether we SHOULD because assumes we have checked that before calling
+	# Add cards to the in-play cards, see GameState.add_new_cards
 	def add_new_cards (self, number, index=0):
-		if not len (self.in_play_cards) + len (self.out_of_play_cards) == len (self.deck):
-			i = 0
-			while i < number:
-				num = random.randint (0,len (self.deck)-1)
-				card = self.deck[num]
-				if card not in self.in_play_cards and card not in self.out_of_play_cards:
-					self.in_play_cards.insert (index, card)
-					i += 1
+		self.state.add_new_cards (number, index)
+
+	# The Cards in play, in board order
+	@property
+	def in_play_cards (self):
+		return [self.deck[code] for code in self.state.board]
+
+	# The Cards in found sets
+	@property
+	def out_of_play_cards (self):
+		return [self.deck[code] for code in self.state.out_of_play]
 
 	# Checks if any sets on the board
+	# The board keeps a live count of its sets, so this does not look at the cards
 	def check_if_any_sets (self):
-		for card1 in self.in_play_cards:
-			for card2 in self.in_play_cards:
-				for card3 in self.in_play_cards:
-					if card1 != card2 and card2 != card3 and card1 != card3:
-						if check_set (card1, card2, card3):
-							return True
-		return False
+		return self.state.any_sets ()
+
+	# Yields every set on the board exactly once, in board order
+	# Each set is a tuple of three Cards
+	def iter_sets (self):
+		for found in board.iter_sets (self.state.board.codes):
+			yield tuple (self.deck[code] for code in found)
+
+	# Finds the first set on the board, in board order
+	# Returns a tuple of three Cards, or None if there is no set
+	def find_set (self):
+		found = board.find_set (self.state.board.codes)
+		if found is None:
+			return None
+		return tuple (self.deck[code] for code in found)
 
 	# Checks if game is won
 	def check_if_won (self):
-		return (not self.check_if_any_sets ()) and \
-			   (len (self.in_play_cards) + len (self.out_of_play_cards) == len (self.deck))
+		return self.state.is_won ()
 
 	# Game can only be lost if playing in time mode
 	def check_if_lost (self):
 		return self.time_box.rect.y >= 0
 
+	# Returns the message box and texts shown when the game is "won", "lost" or "paused"
+	# Their content does not change afterwards, so each is built once per game
+	def get_message (self, message):
+		if message not in self.messages:
+			self.messages[message] = self.build_message (message)
+		return self.messages[message]
+
+	def build_message (self, message):
+		message_box = planes.Plane ('message_box',
+									pygame.Rect (left_margin, 
+												top_margin, 
+												3*CARD_WIDTH + 2*space_horiz, 
+												4*CARD_HEIGHT + 3*((WINDOW_HEIGHT - 4*CARD_HEIGHT - 2*top_margin) / 3)))
+		message_box.image.fill ((0,0,0))
+		message_texts = []
+
+		if message == "paused":
+			message_texts.append (ScreenText ("message_text", "Game Paused",
+									pygame.Rect (left_margin, 
+												top_margin, 
+												3*CARD_WIDTH + 2*space_horiz, 
+												4*CARD_HEIGHT + 3*((WINDOW_HEIGHT - 4*CARD_HEIGHT - 2*top_margin) / 3)),
+									FONT_BIG))
+			return [message_box] + message_texts
+
+		total_time = self.state.elapsed ()
+
+		best_time = ""
+		if len(self.model.times) == 0:
+			best_time = format_secs (total_time/ 1000)
+		else:
+			best_time = format_secs (min (self.model.times))
+
+		win_stats_with_loss = "Game Complete! \n" + \
+							  "Total time: " + format_secs (total_time/ 1000) + "\n" +\
+							  "Incorrect Sets: " + str(self.state.sets_wrong) + "\n" +\
+							  "Adjusted Time: " + format_secs ((total_time+(self.state.sets_wrong*TIME_DEDUC))/ 1000) + "\n" +\
+							  "Best time: " + best_time + "\n" +\
+							  "Seed: " + str (self.state.seed)
+
+		lose_stats = "Game Over! \n" + \
+					 "Seed: " + str (self.state.seed)
+
+		stats = win_stats_with_loss
+		if message == "lost":
+			stats = lose_stats
+
+		lines = stats.split ("\n")
+		box_width = 3*CARD_WIDTH + 2*space_horiz
+		for i, line in enumerate (lines):
+			message_texts.append (ScreenText (line, line, 
+								pygame.Rect(left_margin, top_margin + 50*(i+1) ,box_width, 45), FONT_BIG))
+		return [message_box] + message_texts
+
 	# Game can only be lost if playing in time mode
 	def check_in_play (self):
-		return not self.check_if_won() and not self.check_if_lost() and self.paused_time_at == 0 
+		return not self.check_if_won() and not self.check_if_lost() and not self.state.is_paused ()
 
-	# Called infinitely
-	def update (self):
+	# A timed game in play animates its time box, even on frames that draw nothing
+	def animating (self):
+		return self.check_in_play () and self.time_box.is_moving ()
+
+	# Called infinitely, frame_time is the time in milliseconds since the last frame
+	def update (self, frame_time):
 		# if game not in play, display messages, not cards
 		if not self.check_in_play():
 			self.actors = []
 			self.actors += self.gamelabels + self.gamebuttons
-			self.hints_left_label.update_text ("Hints Remaining: " + str (self.hints_left))
-			self.left_in_deck_label.update_text ("Deck: " + str (len (self.deck) - (len (self.in_play_cards) + len (self.out_of_play_cards))))
-
-			message_box = planes.Plane ('message_box',
-										pygame.Rect (left_margin, 
-													top_margin, 
-													3*CARD_WIDTH + 2*space_horiz, 
-													4*CARD_HEIGHT + 3*((WINDOW_HEIGHT - 4*CARD_HEIGHT - 2*top_margin) / 3)))
-			message_box.image.fill ((0,0,0))
-			message_texts = []
+			self.hints_left_label.update_text ("Hints Remaining: " + str (self.state.hints_left))
+			self.left_in_deck_label.update_text ("Deck: " + str (self.state.cards_left ()))
 
 			# if game won or lost, note time game ended
 			if self.check_if_won () or self.check_if_lost ():
-				if self.end_time == 0:
-					self.end_time = pygame.time.get_ticks ()
-
-				total_time = self.end_time - self.start_time - self.pause_time
+				self.state.end ()
 
 				if self.check_if_won () and not self.added_time:
-					self.model.add_time((total_time+(self.sets_wrong*TIME_DEDUC))/ 1000)
+					self.model.add_time((self.state.elapsed ()+(self.state.sets_wrong*TIME_DEDUC))/ 1000)
 					self.added_time = True
 
-				best_time = ""
-				if len(self.model.times) == 0:
-					best_time = format_secs (total_time/ 1000)
-				else:
-					best_time = format_secs (min (self.model.times))
-
-				win_stats = "Game Complete! \n" + \
-							"Total time: " + format_secs ((self.end_time - self.start_time - self.pause_time)/ 1000) + "\n" +\
-							"Best time: " + best_time
-
-				win_stats_with_loss = "Game Complete! \n" + \
-									  "Total time: " + format_secs (total_time/ 1000) + "\n" +\
-									  "Incorrect Sets: " + str(self.sets_wrong) + "\n" +\
-									  "Adjusted Time: " + format_secs ((total_time+(self.sets_wrong*TIME_DEDUC))/ 1000) + "\n" +\
-									  "Best time: " + best_time
+				message = "won"
+				if self.check_if_lost ():
+					message = "lost"
 
-				lose_stats = "Game Over!"
+			else: #game is paused
+				message = "paused"
 
-				stats = win_stats_with_loss
-				if self.check_if_lost ():
-					stats = lose_stats
-
-				lines = stats.split ("\n")
-				box_width = 3*CARD_WIDTH + 2*space_horiz
-				for line in lines:
-					message_texts.append (ScreenText (line, line, 
-										pygame.Rect(left_margin, top_margin + 50*(lines.index(line)+1) ,box_width, 45), FONT_BIG))
-
-			elif self.paused_time_at != 0: #game is paused
-				message_texts.append (ScreenText ("message_text", "Game Paused",
-										pygame.Rect (left_margin, 
-													top_margin, 
-													3*CARD_WIDTH + 2*space_horiz, 
-													4*CARD_HEIGHT + 3*((WINDOW_HEIGHT - 4*CARD_HEIGHT - 2*top_margin) / 3)),
-										FONT_BIG))
-				
-			self.actors.append (message_box)
-			self.actors += message_texts
+			self.actors += self.get_message (message)
 			self.actors += self.pausebuttons
 
 		# game in play
 		else:
-			self.time_box.update ()
+			self.time_box.advance (frame_time)
 			self.actors = [self.time_box]
 
 			#check which cards are clicked
@@ -556,55 +595,43 @@ class Game ():
 					self.clicked_cards.append (card)
 				card.update ()
 
-			#add click boxes
-			for card in self.clicked_cards:
-				clicked_box = planes.Plane ("box" + card.name,
-											pygame.Rect (card.rect.x-5,
-														 card.rect.y-5,
-														 card.rect.width + 10,
-														 card.rect.height + 10),
-											False, False)
-				clicked_box.image = pygame.image.load ("img/clickbox.png")
+			#add click boxes, moving the pooled ones into place
+			for i in range (len (self.clicked_cards)):
+				card = self.clicked_cards[i]
+				clicked_box = self.get_click_box (i)
+				clicked_box.rect.topleft = (card.rect.x-5, card.rect.y-5)
 				self.actors.insert (1, clicked_box)
 
 			#check for sets
 			if len (self.clicked_cards) == 3:
-				is_set = check_set (self.clicked_cards[0], 
-									self.clicked_cards[1],
-									self.clicked_cards[2])
+				#removes the cards and adds new ones if they are a set
+				is_set = self.state.submit (self.clicked_cards[0].code,
+											self.clicked_cards[1].code,
+											self.clicked_cards[2].code)
 				if is_set:
-					self.sets_found += 1
-					self.sets_found_label.update_text ("Sets: " + str (self.sets_found))
+					self.sets_found_label.update_text ("Sets: " + str (self.state.sets_found))
 
 					# reset the time box
 					self.time_box.rect.y = -WINDOW_HEIGHT
-
-					#remove cards and add new ones
-					for card in self.clicked_cards:
-						self.out_of_play_cards.append (card)
-						index = self.in_play_cards.index (card)
-						self.in_play_cards.remove (card)
-						if len (self.in_play_cards) < 12:
-							self.add_new_cards (1, index)
-				else:
-					self.sets_wrong += 1
 				for card in self.clicked_cards:
 					card.been_clicked = False
 
 			self.actors += self.gamelabels + self.gamebuttons
-			self.time_label.update_text ("Time: " + format_secs ((pygame.time.get_ticks () - self.start_time - self.pause_time)/ 1000))
-			self.hints_left_label.update_text ("Hints Remaining: " + str (self.hints_left))
-			self.left_in_deck_label.update_text ("Deck: " + str (len (self.deck) - (len (self.in_play_cards) + len (self.out_of_play_cards))))
+			self.time_label.update_text ("Time: " + format_secs (self.state.elapsed ()/ 1000))
+			self.hints_left_label.update_text ("Hints Remaining: " + str (self.state.hints_left))
+			self.left_in_deck_label.update_text ("Deck: " + str (self.state.cards_left ()))
 
 '''
 The Model is the overall object in controlling the entire program
 It instantiates Game objects as needed but also contains home screen
+If seed is given, every game is dealt from it, to replay a game for debugging
 '''
 class Model:
-	def __init__ (self):
+	def __init__ (self, seed=None):
 		self.background = (20,20,20)
 		self.mode = MODE_HOME
 		self.game_select = NOTIME
+		self.seed = seed
 
 		self.game = None
 		self.actors = []
@@ -612,7 +639,7 @@ class Model:
 			times_file = open("times_file.txt","r")
 		except:
 			times_file = open("times_file.txt", "w+")
-		self.times = [int(score.strip()) for score in times_file.readlines()]
+		self.times = [float(score.strip()) for score in times_file.readlines()]
 		times_file.close()
 		self.show_stats = [] # a list of things for stats screen
 
@@ -649,6 +676,10 @@ class Model:
 										self)
 
 		self.homebuttons = [self.start_button, self.notime_button, self.easy_button, self.med_button, self.hard_button, self.stats_button]
+
+		# black box behind the selected button, moved in update
+		# all home buttons have the same size
+		self.clicked_box = planes.Plane ("clicked_box", self.notime_button.rect.inflate (10, 10), False, False)
 	
 	# Opens the times file and writes a new time score to the end
 	def add_time(self, time):
@@ -658,7 +689,8 @@ class Model:
 		times_file.close()
 
 	# update model - either update homescreen or update game
-	def update (self):
+	# frame_time is the time in milliseconds since the last frame
+	def update (self, frame_time):
 		if self.mode == MODE_HOME:
 			self.actors = [self.title] + self.homebuttons[:]
 			if self.show_stats != None:
@@ -669,48 +701,55 @@ class Model:
 				if button.clickbox:
 					clicked_button = button
 
-			clicked_box = planes.Plane ("box" + clicked_button.name,
-										pygame.Rect (clicked_button.rect.x-5,
-													 clicked_button.rect.y-5,
-													 clicked_button.rect.width + 10,
-													 clicked_button.rect.height + 10),
-										False, False)
+			self.clicked_box.rect.topleft = (clicked_button.rect.x-5, clicked_button.rect.y-5)
 
-			self.actors.insert (1, clicked_box)
+			self.actors.insert (1, self.clicked_box)
 		
 		else:
-			self.game.update ()
+			self.game.update (frame_time)
 			self.actors = self.game.actors[:]
 
+	# Tells the frame scheduler not to go idle, see scheduler.py
+	def animating (self):
+		return self.mode == MODE_GAME and self.game is not None and self.game.animating ()
+
 '''
 Draw elements of Model actors onto screen
+The screen keeps its subplanes between frames, and only the actors that
+changed are added, removed or moved, so an unchanged frame renders nothing
 '''
 class View:
 	def __init__ (self, model, screen):
 		self.model = model
 		self.screen = screen
+		self.background = None # background currently on the screen
 
 	def draw (self):
-		screen.remove_all ()
-		if isinstance (self.model.background, str):
-			self.screen.image = pygame.transform.scale (pygame.image.load (self.model.background),
-													   (WINDOWWIDTH,WINDOWHEIGHT))
-		else:
-			self.screen.image.fill (self.model.background)
+		# a new background image makes the screen render again
+		if self.model.background != self.background:
+			if isinstance (self.model.background, str):
+				self.screen.image = pygame.transform.scale (assets.load_image (self.model.background),
+														   (WINDOW_WIDTH,WINDOW_HEIGHT))
+			else:
+				background = pygame.Surface (self.screen.rect.size)
+				background.fill (self.model.background)
+				self.screen.image = background
+			self.background = self.model.background
 
 		#put cards in play into a grid:
 
-		if model.game != None:
+		if self.model.game != None:
+			in_play_cards = self.model.game.in_play_cards
 			space_vert = 50
 			# space_vert changes so that cards adjust themselves if more than 12
 			# never more than 21, any collection of 20 cards must contain a Set
-			if len (self.model.game.in_play_cards) == 12:
+			if len (in_play_cards) == 12:
 				space_vert = (WINDOW_HEIGHT - 4*CARD_HEIGHT - 2*top_margin) / 3
-			elif len (self.model.game.in_play_cards) == 15:
+			elif len (in_play_cards) == 15:
 				space_vert = (WINDOW_HEIGHT - 5*CARD_HEIGHT - 2*top_margin) / 4
-			elif len (self.model.game.in_play_cards) == 18:
+			elif len (in_play_cards) == 18:
 				space_vert = (WINDOW_HEIGHT - 6*CARD_HEIGHT - 2*top_margin) / 5
-			elif len (self.model.game.in_play_cards) == 21:
+			elif len (in_play_cards) == 21:
 				space_vert = (WINDOW_HEIGHT - 7*CARD_HEIGHT - 2*top_margin) / 6
 
 			# create positions of cards
@@ -743,38 +782,80 @@ class View:
 						(left_margin + 2*CARD_WIDTH + 2*space_horiz, top_margin + 6*CARD_HEIGHT + 6*space_vert) ]
 			
 			# assign positions to cards in play
-			for i in range (len (self.model.game.in_play_cards)):
-				self.model.game.in_play_cards[i].rect.x = positions[i][0]
-				self.model.game.in_play_cards[i].rect.y = positions[i][1]
+			for i in range (len (in_play_cards)):
+				in_play_cards[i].rect.x = positions[i][0]
+				in_play_cards[i].rect.y = positions[i][1]
 
-		# add all actors to screen
-		for actor in self.model.actors:
-			self.screen.sub (actor)
+		# make the actors the subplanes of the screen, changing only what differs
+		self.screen.sync_subplanes (self.model.actors)
 
 # THE MAIN LOOP
 if __name__ == "__main__":
+	parser = argparse.ArgumentParser (description="A Python implementation of the card game Set")
+	parser.add_argument ("--seed", type=int, default=None, help="deal every game from this seed, to replay a game")
+	parser.add_argument ("--fps", type=int, default=scheduler.FPS, help="frames per second while something moves")
+	parser.add_argument ("--show-fps", action="store_true", help="print the achieved FPS and CPU time per frame every second")
+	parser.add_argument ("--render-thread", action="store_true", help="composite frames on a second thread while the next one is prepared")
+	parser.add_argument ("--metrics", metavar="FILE", default=None, help="append rendering statistics of every frame to FILE, as CSV if it ends in .csv, else as JSON lines")
+	args = parser.parse_args ()
+
 	pygame.init ()
 	size = (WINDOW_WIDTH, WINDOW_HEIGHT)
 	screen = planes.Display (size)
 	screen.grab = False
 	screen.image.fill (BLACK)
-	model = Model ()
+	# the mouse is hit-tested against the screen's planes every frame
+	screen.use_spatial_index ()
+	if args.render_thread:
+		screen.use_render_thread ()
+	if args.metrics:
+		# written on a background thread, and closed on exit
+		planes.STATS.sink = planes.MetricsSink (args.metrics)
+	model = Model (args.seed)
 	view = View (model, screen)
+	frames = scheduler.FrameScheduler (args.fps)
 	running = True
+	# with --render-thread, a frame is shown in the next pass of the loop
+	pending_rects = []
+	seeded_game = None # the last game whose seed was printed
 
 	while running:
-		events = pygame.event.get ()
+		# blocks while nothing changes on screen, see scheduler.py
+		events = frames.get_events ()
 		for event in events:
 			if event.type == pygame.QUIT:
 				raise SystemExit
 
+		# screen.process and screen.render time their own phases, see F12
 		screen.process (events)
-		model.update ()
-		screen.update ()
-		screen.render ()
-		
+		planes.PROFILER.start ("update")
+		model.update (frames.frame_time)
+		# print the seed of every new game, so it can be played again with --seed
+		if model.game is not None and model.game is not seeded_game:
+			seeded_game = model.game
+			print ("Seed: {} (play this game again with --seed {})".format (seeded_game.state.seed, seeded_game.state.seed))
 		view.draw ()
-		pygame.display.flip ()
-		time.sleep (.001)
+		planes.PROFILER.stop ("update")
+		# the render thread has composited the last frame meanwhile
+		# show it before the planes redraw themselves in screen.update
+		planes.PROFILER.start ("flip")
+		screen.wait_render ()
+		pygame.display.update (pending_rects)
+		planes.PROFILER.stop ("flip")
+		planes.PROFILER.start ("update")
+		screen.update ()
+		planes.PROFILER.stop ("update")
+		# only the areas that changed are copied to the window
+		dirty_rects = screen.render ()
+		if args.render_thread:
+			pending_rects = dirty_rects
+		else:
+			planes.PROFILER.start ("flip")
+			pygame.display.update (dirty_rects)
+			planes.PROFILER.stop ("flip")
+
+		# a timed game keeps the frame rate, its time box moves a pixel only every few frames
+		if frames.end_frame (len (dirty_rects) > 0 or model.animating ()) and args.show_fps:
+			print (frames.report ())
 
-	pygame.quit ()
\ No newline at end of file
+	pygame.quit ()
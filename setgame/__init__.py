@@ -0,0 +1,7 @@
+# Anne LoVerso
+# Python Set Game
+
+'''
+setgame holds the rules of Set without any pygame dependency, so they can be
+used by the pygame front end in set.py as well as by offline tools
+'''
@@ -0,0 +1,81 @@
+# Anne LoVerso
+# Python Set Game - batch Set checking with NumPy
+
+'''
+Counts Sets on many boards at once, for offline analysis
+Boards are given as an (N, k) int array of card codes, one board of k distinct
+cards per row. Every card is looked up in its bit-packed form (see
+setgame.cards.PACKED), the packed cards of every triple of columns are added,
+and the sums are checked against cards.SET_SUMS, the same table check_set
+uses. So the answers match check_set exactly.
+Needs numpy, which the game itself does not.
+'''
+
+import itertools
+
+import numpy
+
+from setgame import cards
+
+_PACKED = numpy.array (cards.PACKED, dtype=numpy.uint16)
+_SET_SUMS = numpy.array (cards.SET_SUMS, dtype=bool)
+
+# index arrays of all column triples (i < j < k), by board size
+_triples = {}
+
+'''
+Given a board size, returns three index arrays with every triple of columns
+'''
+def _triple_columns (size):
+	if size not in _triples:
+		columns = numpy.array (list (itertools.combinations (range (size), 3)), dtype=numpy.intp)
+		columns = columns.reshape (-1, 3)
+		_triples[size] = (columns[:,0], columns[:,1], columns[:,2])
+	return _triples[size]
+
+'''
+Given an (N, k) array of card codes, returns an (N, T) bool array telling for
+each of the T column triples of each board whether it is a Set
+Triples are in itertools.combinations order
+'''
+def set_table (boards):
+	boards = numpy.asarray (boards)
+	if boards.ndim != 2:
+		raise ValueError ("boards must be an (N, k) array of card codes, got shape " + str (boards.shape))
+	if boards.size and (boards.min () < 0 or boards.max () >= cards.NUM_CARDS):
+		raise ValueError ("card codes must be between 0 and " + str (cards.NUM_CARDS - 1))
+	first, second, third = _triple_columns (boards.shape[1])
+	packed = _PACKED[boards]
+	return _SET_SUMS[packed[:,first] + packed[:,second] + packed[:,third]]
+
+'''
+Given an (N, k) array of card codes, counts the Sets on every board
+chunk is the number of boards worked on at once, which bounds memory use
+Returns: (N,) int array
+'''
+def count_sets (boards, chunk=4096):
+	boards = numpy.asarray (boards)
+	counts = numpy.empty (len (boards), dtype=numpy.int64)
+	for start in range (0, len (boards), chunk):
+		counts[start:start+chunk] = set_table (boards[start:start+chunk]).sum (axis=1)
+	return counts
+
+'''
+Given an (N, k) array of card codes, checks which boards have a Set
+Returns: (N,) bool array
+'''
+def has_set (boards, chunk=4096):
+	boards = numpy.asarray (boards)
+	found = numpy.empty (len (boards), dtype=bool)
+	for start in range (0, len (boards), chunk):
+		found[start:start+chunk] = set_table (boards[start:start+chunk]).any (axis=1)
+	return found
+
+'''
+Deals n random boards of size cards each, without repeated cards on a board
+Returns: (n, size) array of card codes
+'''
+def random_boards (n, size, seed=None):
+	rng = numpy.random.default_rng (seed)
+	# the first size columns of a random permutation of the deck, for every board
+	return numpy.argsort (rng.random ((n, cards.NUM_CARDS)), axis=1)[:,:size]
@@ -0,0 +1,130 @@
+# Anne LoVerso
+# Python Set Game - board queries
+
+'''
+Queries on a board of cards, given as a list of card codes
+Any two cards of a Set determine the third, so instead of trying every triple
+these look up the third card of each pair in cards.THIRD and test it against a
+membership bitmap of the board: at most n(n-1)/2 probes for n cards.
+'''
+
+from setgame.cards import THIRD
+
+'''
+Given a list of card codes, returns an int with bit code set for every card
+'''
+def board_mask (codes):
+	mask = 0
+	for code in codes:
+		mask |= 1 << code
+	return mask
+
+'''
+Given a list of card codes, checks whether any three of them form a Set
+Returns: True if there is a Set, False otherwise
+'''
+def has_set (codes):
+	return find_set (codes) is not None
+
+'''
+Given a list of card codes, finds the first Set in board order
+This is the first Set iter_sets would yield, without building its position table
+Returns: tuple of three codes in board order, or None if there is no Set
+'''
+def find_set (codes):
+	mask = board_mask (codes)
+	for i in range (len (codes)):
+		row = THIRD[codes[i]]
+		for j in range (i+1, len (codes)):
+			third = row[codes[j]]
+			# scanning i and j in order, the third card always comes after j:
+			# had it been earlier, that pair would have been found first
+			if (mask >> third) & 1:
+				return (codes[i], codes[j], third)
+	return None
+
+'''
+Given a list of card codes, yields every Set among them exactly once
+Each Set is a tuple of three codes in board order. The Sets come in the order
+of their positions (i, j, k), i < j < k, so the first one is the Set made of
+the earliest cards. Sets are found lazily, so a caller can stop early.
+'''
+def iter_sets (codes):
+	mask = board_mask (codes)
+	position = dict ((code, i) for i, code in enumerate (codes))
+	for i in range (len (codes)):
+		row = THIRD[codes[i]]
+		for j in range (i+1, len (codes)):
+			third = row[codes[j]]
+			# the other two orderings of this Set are skipped by only taking
+			# the pair made of its first two cards
+			if (mask >> third) & 1 and position[third] > j:
+				yield (codes[i], codes[j], third)
+
+'''
+Given a list of card codes, counts the Sets among them
+Every Set is found once for each of its three pairs
+Returns: number of Sets
+'''
+def count_sets (codes):
+	mask = board_mask (codes)
+	found = 0
+	for i in range (len (codes)):
+		row = THIRD[codes[i]]
+		for j in range (i+1, len (codes)):
+			found += (mask >> row[codes[j]]) & 1
+	return found // 3
+
+'''
+A Board is the ordered list of card codes in play, together with its
+membership bitmap and a live count of the Sets on it
+The count is updated when a card is added or removed, so checking whether
+the board has a Set does not need to look at the cards at all
+'''
+class Board:
+	def __init__ (self, codes=()):
+		self.codes = []
+		self.mask = 0
+		self.set_count = 0
+		for code in codes:
+			self.insert (len (self.codes), code)
+
+	def __len__ (self):
+		return len (self.codes)
+
+	def __iter__ (self):
+		return iter (self.codes)
+
+	def __getitem__ (self, index):
+		return self.codes[index]
+
+	def __contains__ (self, code):
+		return (self.mask >> code) & 1 == 1
+
+	# Number of Sets the card with this code forms with two other cards on the board
+	def _completions (self, code):
+		row = THIRD[code]
+		found = 0
+		for other in self.codes:
+			if other != code:
+				found += (self.mask >> row[other]) & 1
+		# each Set is seen from both of the other two cards
+		return found // 2
+
+	# Adds the card at the position index, like list.insert
+	def insert (self, index, code):
+		self.codes.insert (index, code)
+		self.mask |= 1 << code
+		self.set_count += self._completions (code)
+
+	# Removes the card and returns the position it was at
+	# Raises ValueError, leaving the board as it was, if the card is not on it
+	def remove (self, code):
+		index = self.codes.index (code)
+		self.set_count -= self._completions (code)
+		del self.codes[index]
+		self.mask &= ~(1 << code)
+		return index
+
+	def has_set (self):
+		return self.set_count > 0
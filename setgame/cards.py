@@ -0,0 +1,81 @@
+# Anne LoVerso
+# Python Set Game - compact card encoding
+
+'''
+Every card is encoded as an integer code from 0 to 80, made of four base-3
+digits: color, shape, number and shade, most significant first.
+This is the same order the deck is built in, so deck[code] is the card with that code.
+'''
+
+COLORS = ['green', 'red', 'purple']
+SHAPES = ['oval', 'diamond', 'squiggle']
+NUMBERS = [1,2,3]
+SHADES = ['filled','shaded', 'empty']
+
+NUM_CARDS = 81
+
+'''
+Given the four attributes of a card, returns its code
+Returns: int from 0 to 80
+'''
+def encode (color, shape, number, shade):
+	return ((COLORS.index (color)*3 + SHAPES.index (shape))*3 + NUMBERS.index (number))*3 + SHADES.index (shade)
+
+'''
+Given a card code, returns its attributes
+Returns: tuple (color, shape, number, shade)
+'''
+def decode (code):
+	code, shade = divmod (code, 3)
+	code, number = divmod (code, 3)
+	color, shape = divmod (code, 3)
+	return (COLORS[color], SHAPES[shape], NUMBERS[number], SHADES[shade])
+
+'''
+Packs the four base-3 digits of a code into separate 3-bit fields
+The sum of three packed cards never carries from one field into the next,
+because each field sums to at most 2+2+2 = 6
+'''
+def _pack (code):
+	packed = 0
+	for field in range (4):
+		code, digit = divmod (code, 3)
+		packed |= digit << (3*field)
+	return packed
+
+PACKED = [_pack (code) for code in range (NUM_CARDS)]
+
+# Three digits are all the same or all different exactly when they sum to 0, 3 or 6,
+# so a packed sum is a Set when every one of its four fields is 0, 3 or 6
+SET_SUMS = [all (((total >> (3*field)) & 7) in (0, 3, 6) for field in range (4))
+			for total in range (3 * PACKED[NUM_CARDS-1] + 1)]
+
+'''
+Given three card codes, checks whether they form a Set
+Returns: True if cards form a Set, False otherwise
+'''
+def is_set (code1, code2, code3):
+	return SET_SUMS[PACKED[code1] + PACKED[code2] + PACKED[code3]]
+
+'''
+Given two card codes, computes the code of the only card that completes them to a Set
+Each digit of the third card is -(digit1 + digit2) mod 3
+'''
+def _complete (code1, code2):
+	third = 0
+	place = 1
+	for field in range (4):
+		code1, digit1 = divmod (code1, 3)
+		code2, digit2 = divmod (code2, 3)
+		third += (-(digit1 + digit2) % 3) * place
+		place *= 3
+	return third
+
+# THIRD[code1][code2] is the code of the card completing code1 and code2 to a Set
+THIRD = [[_complete (code1, code2) for code2 in range (NUM_CARDS)] for code1 in range (NUM_CARDS)]
+
+'''
+Given two card codes, returns the code of the card that completes them to a Set
+'''
+def third_card (code1, code2):
+	return THIRD[code1][code2]
@@ -0,0 +1,181 @@
+# Anne LoVerso
+# Python Set Game - Monte Carlo game simulator
+
+'''
+Plays complete games headlessly with GameState and reports how big the board
+gets, how often three cards have to be dealt because there is no Set, and how
+many cards are left on the board when the deck runs out.
+
+Run from the top of the repository:
+	python -m setgame.simulate -n 100000 --strategy random --processes 8
+
+Games are split into chunks, each with its own seed derived from the main seed,
+so the results only depend on the seed and the number of games, not on the
+number of processes. Every game gets its own seed from its chunk, and the
+strategy draws from the game's own random generator, so any single game can be
+played again from its seed.
+'''
+
+import argparse
+import collections
+import multiprocessing
+import random
+
+from setgame import board
+from setgame.state import GameState
+
+CHUNK_SIZE = 1000
+
+'''
+Strategies pick the Set the player takes from a board
+Args: codes - the card codes on the board, rng - random.Random of the game state
+Returns: tuple of three codes, or None if there is no Set
+'''
+def first_set (codes, rng):
+	return board.find_set (codes)
+
+def random_set (codes, rng):
+	found = list (board.iter_sets (codes))
+	if not found:
+		return None
+	return rng.choice (found)
+
+STRATEGIES = {'first': first_set, 'random': random_set}
+
+# the simulated games do not look at the time
+def _no_clock ():
+	return 0
+
+'''
+Statistics of a number of simulated games
+board_sizes counts the board sizes seen each time the player looked for a Set
+max_board_sizes counts the biggest board of each game
+deal_threes counts the number of times three cards were dealt in a game
+leftovers counts the number of cards left on the board at the end of a game
+'''
+class SimulationResult:
+	def __init__ (self):
+		self.games = 0
+		self.board_sizes = collections.Counter ()
+		self.max_board_sizes = collections.Counter ()
+		self.deal_threes = collections.Counter ()
+		self.leftovers = collections.Counter ()
+
+	# Adds the counts of another result to this one
+	def merge (self, other):
+		self.games += other.games
+		self.board_sizes.update (other.board_sizes)
+		self.max_board_sizes.update (other.max_board_sizes)
+		self.deal_threes.update (other.deal_threes)
+		self.leftovers.update (other.leftovers)
+
+	# Fraction of games in which the board reached at least size cards
+	def reached (self, size):
+		if self.games == 0:
+			return 0.0
+		return sum (count for biggest, count in self.max_board_sizes.items () if biggest >= size) / float (self.games)
+
+	def report (self):
+		lines = ["Games: " + str (self.games)]
+
+		looks = sum (self.board_sizes.values ())
+		lines.append ("Board sizes seen:")
+		for size in sorted (self.board_sizes):
+			lines.append ("  {:2d} cards: {:6.2f}%".format (size, 100.0 * self.board_sizes[size] / looks))
+
+		lines.append ("Games reaching a board of:")
+		for size in (15, 18, 21):
+			lines.append ("  {:2d} cards: {:6.2f}%".format (size, 100.0 * self.reached (size)))
+
+		lines.append ("Deals of three cards per game: mean {:.3f}".format (_mean (self.deal_threes)))
+		for deals in sorted (self.deal_threes):
+			lines.append ("  {:2d}: {:6.2f}%".format (deals, 100.0 * self.deal_threes[deals] / self.games))
+
+		lines.append ("Cards left at the end: mean {:.3f}".format (_mean (self.leftovers)))
+		for left in sorted (self.leftovers):
+			lines.append ("  {:2d}: {:6.2f}%".format (left, 100.0 * self.leftovers[left] / self.games))
+
+		return "\n".join (lines)
+
+# Mean of a Counter of values
+def _mean (counter):
+	total = sum (counter.values ())
+	if total == 0:
+		return 0.0
+	return sum (value * count for value, count in counter.items ()) / float (total)
+
+'''
+Plays the game with the given seed to the end and adds it to result
+Follows the game rules: a Set found is replaced from the deck, and three cards
+are dealt when there is no Set on the board
+'''
+def play_game (strategy, seed, result):
+	state = GameState (_no_clock, seed)
+	deal_threes = 0
+	biggest = 0
+	while True:
+		size = len (state.board)
+		result.board_sizes[size] += 1
+		biggest = max (biggest, size)
+		found = strategy (state.board.codes, state.rng)
+		if found is not None:
+			state.submit (*found)
+		elif state.cards_left () > 0:
+			state.add_new_cards (3)
+			deal_threes += 1
+		else:
+			break
+	result.games += 1
+	result.max_board_sizes[biggest] += 1
+	result.deal_threes[deal_threes] += 1
+	result.leftovers[len (state.board)] += 1
+
+'''
+Plays one chunk of games, the unit of work of the process pool
+Args: (strategy name, main seed, chunk number, number of games)
+'''
+def _play_chunk (args):
+	strategy_name, seed, chunk, games = args
+	strategy = STRATEGIES[strategy_name]
+	rng = random.Random ("{}-{}".format (seed, chunk))
+	result = SimulationResult ()
+	for i in range (games):
+		play_game (strategy, rng.getrandbits (64), result)
+	return result
+
+'''
+Plays n complete games with the given strategy ('first' or 'random')
+processes is the size of the process pool, 1 plays in this process and
+None uses every CPU
+Returns: SimulationResult
+'''
+def simulate (n, strategy='first', seed=0, processes=None, chunk_size=CHUNK_SIZE):
+	if strategy not in STRATEGIES:
+		raise ValueError ("unknown strategy '" + str (strategy) + "', choose from " + ", ".join (sorted (STRATEGIES)))
+	chunks = [(strategy, seed, chunk, min (chunk_size, n - start))
+			  for chunk, start in enumerate (range (0, n, chunk_size))]
+	result = SimulationResult ()
+	if processes == 1:
+		for chunk_result in map (_play_chunk, chunks):
+			result.merge (chunk_result)
+	else:
+		pool = multiprocessing.Pool (processes)
+		try:
+			for chunk_result in pool.imap_unordered (_play_chunk, chunks):
+				result.merge (chunk_result)
+		finally:
+			pool.close ()
+			pool.join ()
+	return result
+
+def main (argv=None):
+	parser = argparse.ArgumentParser (description="Simulate complete games of Set")
+	parser.add_argument ("-n", "--games", type=int, default=10000, help="number of games to play")
+	parser.add_argument ("--strategy", choices=sorted (STRATEGIES), default='first', help="which Set the player takes")
+	parser.add_argument ("--seed", type=int, default=0, help="main seed, games are reproducible from it")
+	parser.add_argument ("--processes", type=int, default=None, help="size of the process pool, every CPU by default")
+	args = parser.parse_args (argv)
+	print (simulate (args.games, args.strategy, args.seed, args.processes).report ())
+
+if __name__ == "__main__":
+	main ()
@@ -0,0 +1,141 @@
+# Anne LoVerso
+# Python Set Game - headless game state
+
+import random
+import time
+
+from setgame import board
+from setgame import cards
+
+NUM_HINTS = 100
+
+'''
+Default clock, the time in milliseconds like pygame.time.get_ticks
+'''
+def default_clock ():
+	return int (time.monotonic () * 1000)
+
+'''
+A GameState holds the rules of a single game: the deck, the board, found and
+wrong Sets, hints and the clock. It draws nothing and does not need pygame,
+so games can be simulated and tested without a display.
+Cards are card codes, see setgame.cards.
+clock is a function returning the current time in milliseconds
+seed decides the order of the deck, so a game can be played again from its
+seed. A random seed is picked if it is not given.
+'''
+class GameState:
+	def __init__ (self, clock=default_clock, seed=None, num_hints=NUM_HINTS):
+		self.clock = clock
+
+		if seed is None:
+			seed = random.randrange (2**32)
+		self.seed = seed
+		self.rng = random.Random (seed)
+
+		# the deck is shuffled once and dealt from the end
+		self.draw_pile = list (range (cards.NUM_CARDS))
+		self.rng.shuffle (self.draw_pile)
+
+		self.board = board.Board () # codes of the cards in play, in board order
+		self.out_of_play = [] # codes of the cards in found sets
+
+		self.sets_found = 0
+		self.sets_wrong = 0
+		self.hints_left = num_hints
+
+		self.pause_time = 0 # total time spent paused
+		self.paused_at = None # time the game was paused at, None if not paused
+		self.start_time = self.clock ()
+		self.end_time = None # time game ended at, None while it goes on
+
+		# start the game
+		self.add_new_cards (12)
+
+	# Number of cards not dealt yet
+	def cards_left (self):
+		return len (self.draw_pile)
+
+	# Add cards to the board
+	# Number = number of cards to add
+	# Index allows adding 1 card in the same position as a removed card
+	# Does not check whether we SHOULD because assumes we have checked that before calling
+	def add_new_cards (self, number, index=0):
+		for i in range (min (number, len (self.draw_pile))):
+			self.board.insert (index, self.draw_pile.pop ())
+
+	# Checks if any sets on the board
+	def any_sets (self):
+		return self.board.has_set ()
+
+	# Game is won when the deck is used up and no sets are left
+	def is_won (self):
+		return not self.any_sets () and self.cards_left () == 0
+
+	def is_paused (self):
+		return self.paused_at is not None
+
+	def pause (self):
+		if not self.is_paused ():
+			self.paused_at = self.clock ()
+
+	def resume (self):
+		if self.is_paused ():
+			self.pause_time += self.clock () - self.paused_at
+			self.paused_at = None
+
+	# Notes the time the game ended at, only the first time it is called
+	def end (self):
+		if self.end_time is None:
+			self.end_time = self.clock ()
+
+	# Time played in milliseconds, not counting pauses
+	def elapsed (self):
+		if self.end_time is not None:
+			now = self.end_time
+		elif self.paused_at is not None:
+			now = self.paused_at
+		else:
+			now = self.clock ()
+		return now - self.start_time - self.pause_time
+
+	# Takes three cards picked by the player
+	# If they form a set they are replaced with new cards, otherwise a wrong set is counted
+	# Returns True if the cards form a set
+	# Raises ValueError, before changing anything, unless the cards are three different cards on the board
+	def submit (self, code1, code2, code3):
+		if len (set ((code1, code2, code3))) != 3:
+			raise ValueError ("a set is three different cards, got " + str ((code1, code2, code3)))
+		for code in (code1, code2, code3):
+			if code not in self.board:
+				raise ValueError ("card " + str (code) + " is not on the board")
+		if not cards.is_set (code1, code2, code3):
+			self.sets_wrong += 1
+			return False
+		self.sets_found += 1
+		for code in (code1, code2, code3):
+			self.out_of_play.append (code)
+			index = self.board.remove (code)
+			if len (self.board) < 12:
+				self.add_new_cards (1, index)
+		return True
+
+	# Uses up a hint
+	# Returns the first set on the board as a tuple of codes, or None if
+	# there is no set, in which case three cards are added instead
+	def hint (self):
+		if self.hints_left <= 0:
+			return None
+		self.hints_left -= 1
+		found = board.find_set (self.board.codes)
+		if found is None:
+			self.add_new_cards (3)
+		return found
+
+	# Adds three cards if there is no set on the board
+	# Returns True if cards were added
+	def add_three (self):
+		if self.any_sets ():
+			return False
+		self.add_new_cards (3)
+		return True
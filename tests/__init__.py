@@ -0,0 +1,3 @@
+# Anne LoVerso
+# Python Set Game - tests
+# Run from the top of the repository: python -m pytest tests
@@ -0,0 +1,61 @@
+# Anne LoVerso
+# Python Set Game - tests of the board queries
+
+import random
+
+import pytest
+
+from setgame import board
+from setgame import cards
+from setgame.board import Board
+
+# Removing a card that is not on the board must not touch the live Set count
+def test_remove_missing_card_keeps_board ():
+	board = Board (range (12))
+	codes = board.codes[:]
+	set_count = board.set_count
+	with pytest.raises (ValueError):
+		board.remove (80)
+	assert board.codes == codes
+	assert board.set_count == set_count
+
+'''
+Every Set among codes, by trying every triple of positions i < j < k
+'''
+def brute_force_sets (codes):
+	found = []
+	for i in range (len (codes)):
+		for j in range (i+1, len (codes)):
+			for k in range (j+1, len (codes)):
+				if cards.is_set (codes[i], codes[j], codes[k]):
+					found.append ((codes[i], codes[j], codes[k]))
+	return found
+
+def random_boards (seed, per_size=100):
+	rng = random.Random (seed)
+	for size in range (3, 22):
+		for i in range (per_size):
+			yield rng.sample (range (cards.NUM_CARDS), size)
+
+@pytest.mark.parametrize ("seed", [0, 1, 2])
+def test_queries_match_brute_force (seed):
+	for codes in random_boards (seed):
+		expected = brute_force_sets (codes)
+		assert list (board.iter_sets (codes)) == expected, codes
+		assert board.find_set (codes) == (expected[0] if expected else None), codes
+		assert board.has_set (codes) == (len (expected) > 0), codes
+		assert board.count_sets (codes) == len (expected), codes
+
+@pytest.mark.parametrize ("seed", [0, 1, 2])
+def test_live_count_matches_brute_force (seed):
+	rng = random.Random (seed)
+	live = Board ()
+	for i in range (2000):
+		if len (live) < 21 and (len (live) < 3 or rng.random () < 0.5):
+			code = rng.choice ([code for code in range (cards.NUM_CARDS) if code not in live])
+			live.insert (rng.randint (0, len (live)), code)
+		else:
+			live.remove (rng.choice (live.codes))
+		assert live.set_count == len (brute_force_sets (live.codes)), live.codes
+		assert live.has_set () == (live.set_count > 0)
+	assert Board (live.codes).set_count == live.set_count
@@ -0,0 +1,24 @@
+# Anne LoVerso
+# Python Set Game - tests of the card codes
+
+import itertools
+
+from setgame import cards
+
+# A Set is three cards whose every attribute is all the same or all different
+def rule_says_set (code1, code2, code3):
+	attributes = zip (cards.decode (code1), cards.decode (code2), cards.decode (code3))
+	return all (len (set (values)) != 2 for values in attributes)
+
+def test_is_set_matches_rule_on_every_triple ():
+	found = 0
+	for code1, code2, code3 in itertools.combinations (range (cards.NUM_CARDS), 3):
+		assert cards.is_set (code1, code2, code3) == rule_says_set (code1, code2, code3), (code1, code2, code3)
+		found += cards.is_set (code1, code2, code3)
+	assert found == 1080
+
+def test_third_completes_every_pair ():
+	for code1, code2 in itertools.permutations (range (cards.NUM_CARDS), 2):
+		third = cards.THIRD[code1][code2]
+		assert third not in (code1, code2)
+		assert rule_says_set (code1, code2, third)
@@ -0,0 +1,43 @@
+# Anne LoVerso
+# Python Set Game - tests of the game rules
+
+import itertools
+
+import pytest
+
+from setgame.cards import NUM_CARDS, THIRD
+from setgame.state import GameState
+
+def new_state ():
+	return GameState (lambda: 0, seed=1)
+
+# Everything submit may change, to check that a refused submit changed nothing
+def snapshot (state):
+	return (state.board.codes[:], state.board.set_count, state.sets_found,
+			state.sets_wrong, state.out_of_play[:], state.cards_left ())
+
+def test_submit_same_card_three_times ():
+	state = new_state ()
+	code = state.board[0]
+	before = snapshot (state)
+	with pytest.raises (ValueError):
+		state.submit (code, code, code)
+	assert snapshot (state) == before
+
+def test_submit_set_not_on_board ():
+	state = new_state ()
+	off_board = [code for code in range (NUM_CARDS) if code not in state.board]
+	code1, code2, code3 = next ((code1, code2, THIRD[code1][code2])
+								for code1, code2 in itertools.combinations (off_board, 2)
+								if THIRD[code1][code2] not in state.board)
+	before = snapshot (state)
+	with pytest.raises (ValueError):
+		state.submit (code1, code2, code3)
+	assert snapshot (state) == before
+
+def test_submit_set_on_board ():
+	state = new_state ()
+	found = state.hint ()
+	assert state.submit (*found)
+	assert state.sets_found == 1
+	assert all (code not in state.board for code in found)